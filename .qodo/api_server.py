@@ -0,0 +1,191 @@
+"""Headless JSON API for the study assistant.
+
+Run from the .qodo directory:
+    python api_server.py --host 127.0.0.1 --port 8000
+
+Requests are accepted by an async front end and run on a bounded pool of inference
+threads. When API_MAX_PENDING requests are already queued or running, new ones are
+rejected with 503 and a Retry-After header so a load balancer can try another replica.
+"""
+import os
+import time
+import asyncio
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Optional
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel, Field
+import study_assistant
+import quiz_generator
+import model_registry
+import batching
+
+# Each worker blocks in batching.generate while its request waits for a batch, so with
+# batching on the pool needs at least MAX_BATCH_SIZE workers for batches to ever fill
+DEFAULT_WORKERS = batching.MAX_BATCH_SIZE if batching.BATCHING else 2
+INFERENCE_WORKERS = int(os.environ.get("API_WORKERS", str(DEFAULT_WORKERS)))  # Concurrent generations
+if batching.BATCHING and INFERENCE_WORKERS < batching.MAX_BATCH_SIZE:
+    print(f"[DEBUG] API_WORKERS={INFERENCE_WORKERS} caps generation batches below BATCH_MAX_SIZE={batching.MAX_BATCH_SIZE}")
+MAX_PENDING = int(os.environ.get("API_MAX_PENDING", str(max(16, 2 * INFERENCE_WORKERS))))  # Running + queued before rejecting
+REQUEST_TIMEOUT = float(os.environ.get("API_TIMEOUT", "120"))  # seconds
+RETRY_AFTER = 5  # seconds suggested to rejected clients
+WARMUP_RETRY = 30  # seconds between model loading attempts while unready
+DEFAULT_MODEL = os.environ.get("API_DEFAULT_MODEL", "t5-small")
+
+class ResponseRequest(BaseModel):
+    query: str = Field(..., min_length=1)
+    model_name: str = DEFAULT_MODEL
+    max_tokens: int = Field(150, ge=1, le=1024)
+    use_cache: bool = True
+
+class StudyPlanRequest(BaseModel):
+    goal: str = Field(..., min_length=1)
+    model_name: str = DEFAULT_MODEL
+    max_tokens: int = Field(300, ge=1, le=1024)
+    use_cache: bool = True
+
+class QuizRequest(BaseModel):
+    topic: str = Field(..., min_length=1)
+    model_name: str = DEFAULT_MODEL
+    is_interview_prep: bool = False
+    company: Optional[str] = None
+    max_tokens: int = Field(300, ge=1, le=1024)
+
+class InterviewQuizRequest(BaseModel):
+    company: str = "Meta"
+    role: str = "Software Engineer"
+    num_questions: int = Field(10, ge=1, le=50)
+
+class InferencePool:
+    """Bounded thread pool with admission control.
+
+    `pending` counts requests from admission until their worker thread finishes, so a
+    request that timed out for the client still holds its slot while it keeps running.
+    """
+
+    def __init__(self, workers=INFERENCE_WORKERS, max_pending=MAX_PENDING, timeout=REQUEST_TIMEOUT):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="inference")
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.pending = 0
+        self.stats = {"completed": 0, "failed": 0, "rejected": 0, "timed_out": 0}
+        self._lock = threading.Lock()
+
+    def _release(self, _future):
+        with self._lock:
+            self.pending -= 1
+
+    async def run(self, fn, *args, **kwargs):
+        """Run fn in the pool; raises HTTPException 503 when saturated and 504 on timeout."""
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.stats["rejected"] += 1
+                raise HTTPException(503, "Server busy, retry later", headers={"Retry-After": str(RETRY_AFTER)})
+            self.pending += 1
+        future = self.executor.submit(fn, *args, **kwargs)
+        future.add_done_callback(self._release)
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            self.stats["timed_out"] += 1
+            raise HTTPException(504, f"Generation did not finish within {self.timeout:.0f}s")
+        except Exception as e:
+            self.stats["failed"] += 1
+            print(f"Error handling API request: {e}")
+            raise HTTPException(500, str(e))
+        self.stats["completed"] += 1
+        return result
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.stats, pending=self.pending, max_pending=self.max_pending, workers=self.workers)
+
+pool = InferencePool()
+_ready = threading.Event()
+_started = time.time()
+
+def _warm_up():
+    """Load the embedding model, FAISS index and default generator; report ready only if the models loaded.
+
+    The study_assistant loaders catch their own errors and return None, so the results are
+    checked here. A missing FAISS index is tolerated (answers fall back to web search).
+    Failed loads are retried every WARMUP_RETRY seconds.
+    """
+    while not _try_warm_up():
+        time.sleep(WARMUP_RETRY)
+
+def _try_warm_up():
+    embedding_model = study_assistant.load_embedding_model()
+    faiss_index, _ = study_assistant.load_faiss_index()
+    generator, _ = study_assistant.load_model(DEFAULT_MODEL)
+    if faiss_index is None:
+        print("[DEBUG] FAISS index not loaded; API answers will use web search context")
+    if embedding_model is None or generator is None:
+        print(f"Error warming up API server: embedding model or {DEFAULT_MODEL} failed to load; retrying in {WARMUP_RETRY}s")
+        return False
+    _ready.set()
+    return True
+
+@asynccontextmanager
+async def lifespan(app):
+    threading.Thread(target=_warm_up, name="api-warmup", daemon=True).start()
+    yield
+    pool.executor.shutdown(wait=False, cancel_futures=True)
+
+app = FastAPI(title="AI Personal Study Assistant API", lifespan=lifespan)
+
+@app.get("/healthz")
+async def healthz():
+    """Liveness: the process is serving requests."""
+    return {"status": "ok", "uptime_s": round(time.time() - _started, 1)}
+
+@app.get("/readyz")
+async def readyz():
+    """Readiness: models are loaded and the pool has capacity (503 otherwise)."""
+    stats = pool.snapshot()
+    if not _ready.is_set():
+        raise HTTPException(503, "Loading models")
+    if stats["pending"] >= stats["max_pending"]:
+        raise HTTPException(503, "At capacity", headers={"Retry-After": str(RETRY_AFTER)})
+    return {"status": "ready", **stats}
+
+@app.get("/metrics")
+async def metrics():
+    """Pool counters, loaded model resources and generation batching."""
+    return {"pool": pool.snapshot(), "models": model_registry.registry.report(),
+            "memory": model_registry.registry.memory_stats(), "batching": batching.stats()}
+
+@app.post("/v1/response")
+async def response(request: ResponseRequest):
+    answer = await pool.run(study_assistant.generate_response, request.query, request.model_name,
+                            request.max_tokens, request.use_cache)
+    return {"response": answer, "model_name": request.model_name}
+
+@app.post("/v1/study-plan")
+async def study_plan(request: StudyPlanRequest):
+    plan = await pool.run(study_assistant.generate_study_plan, request.goal, request.model_name,
+                          request.max_tokens, request.use_cache)
+    return {"study_plan": plan, "model_name": request.model_name}
+
+@app.post("/v1/quiz")
+async def quiz(request: QuizRequest):
+    text = await pool.run(study_assistant.generate_quiz, request.topic, request.model_name,
+                          request.is_interview_prep, request.company, request.max_tokens)
+    return {"quiz": text, "model_name": request.model_name}
+
+@app.post("/v1/interview-quiz")
+async def interview_quiz(request: InterviewQuizRequest):
+    questions = await pool.run(quiz_generator.generate_quiz, request.company, request.role, request.num_questions)
+    return {"company": request.company, "role": request.role, "questions": questions}
+
+if __name__ == "__main__":
+    import uvicorn
+    parser = argparse.ArgumentParser(description="Serve the study assistant as a JSON API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+    # One event loop per process; scale out with more replicas behind a load balancer
+    uvicorn.run(app, host=args.host, port=args.port, workers=1)
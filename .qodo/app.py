@@ -1,11 +1,21 @@
 import streamlit as st
-import study_assistant
-import chat_history
-import quiz_generator
+import streamlit.components.v1 as components
+import startup
+with startup.timed("import study_assistant", "import"):
+    import study_assistant
+with startup.timed("import chat_history", "import"):
+    import chat_history
+with startup.timed("import quiz_generator", "import"):
+    import quiz_generator
+import model_registry
+import batching
+import user_session
+import process_manager
+import response_cache
+import chat_view
 import time
+from functools import partial
 import re
-import os
-import webbrowser
 
 def parse_quiz(quiz_text):
     """Parse quiz text into structured questions, options, and answers."""
@@ -34,22 +44,58 @@ def parse_quiz(quiz_text):
         questions.append((current_question, current_options, current_answer, current_tip))
     return questions
 
+CHAT_PAGE_SIZE = 20  # Messages rendered in the chat container; older ones load on demand
+SIDEBAR_PAGE_SIZE = 10  # History expanders per sidebar page
+
+def render_chat(history, window):
+    """Render the last `window` messages as a single markdown element."""
+    visible = history[-window:]
+    fragments = "".join(chat_view.message_html(speaker, message) for speaker, message in visible)
+    st.markdown(f'<div class="chat-container">{fragments}</div>', unsafe_allow_html=True)
+
+def pomodoro_countdown_html(remaining_seconds):
+    """Self-updating countdown; runs client-side so an active timer costs no server reruns."""
+    return f"""
+    <div id="pomodoro" style="font-family: 'Segoe UI', sans-serif; font-size: 18px; padding: 8px;"></div>
+    <script>
+    const end = Date.now() + {int(remaining_seconds * 1000)};
+    const el = document.getElementById("pomodoro");
+    function tick() {{
+        const left = Math.max(0, Math.round((end - Date.now()) / 1000));
+        const minutes = Math.floor(left / 60), seconds = String(left % 60).padStart(2, "0");
+        el.textContent = left > 0 ? `Time Left: ${{minutes}}:${{seconds}}` : "Pomodoro session complete!";
+        if (left === 0) clearInterval(timer);
+    }}
+    const timer = setInterval(tick, 1000);
+    tick();
+    </script>
+    """
+
+def render_stream(stream):
+    """Render a GenerationStream token by token, then return its post-processed text."""
+    st.write_stream(stream)
+    return stream.result
+
 def main():
     """Run the Streamlit web app for the study assistant chatbot."""
     st.title("📚 Personal Study Assistant")
     st.write("Ask questions, set goals, generate quizzes, or prepare for interviews!")
 
+    # History and scores are stored per user (the ?user= id in the URL)
+    user_id = user_session.current_user_id()
+
     # Initialize session state
     if "model_name" not in st.session_state:
         st.session_state.model_name = "t5-small"  # Default model
-        st.session_state.chat_history = chat_history.load_chat_history()
+        st.session_state.chat_path = user_session.user_path(user_id, "chat_history.jsonl", legacy_path=chat_history.HISTORY_PATH)
+        st.session_state.chat_history = chat_history.load_chat_history(st.session_state.chat_path)
         st.session_state.awaiting_feedback = False
         st.session_state.last_input = None
         st.session_state.last_answer = None
         st.session_state.debug_response = ""
         st.session_state.current_input_type = "Question"
         st.session_state.pomodoro_running = False
-        st.session_state.pomodoro_time = 25 * 60
+        st.session_state.pomodoro_deadline = None  # Wall-clock end time of the running session
         st.session_state.quiz_answers = {}
         st.session_state.current_quiz = None
         st.session_state.quiz_submitted = False
@@ -66,15 +112,32 @@ def main():
             with st.spinner("Loading model..."):
                 st.session_state.model_name = model_name
                 st.session_state.chat_history = []  # Clear history on model change
-                chat_history.save_chat_history(st.session_state.chat_history)
+                chat_history.save_chat_history(st.session_state.chat_history, st.session_state.chat_path)
 
         st.header("Chat History")
-        if st.session_state.chat_history:
-            for i, (speaker, message) in enumerate(st.session_state.chat_history):
+        history = st.session_state.chat_history
+        if history:
+            # One page of expanders at a time; page 0 holds the newest messages
+            num_pages = (len(history) + SIDEBAR_PAGE_SIZE - 1) // SIDEBAR_PAGE_SIZE
+            page = min(st.session_state.get("history_page", 0), num_pages - 1)
+            end = len(history) - page * SIDEBAR_PAGE_SIZE
+            start = max(0, end - SIDEBAR_PAGE_SIZE)
+            for i in range(start, end):
+                speaker, message = history[i]
                 with st.expander(f"{speaker} ({i+1})"):
                     st.write(message)
+            st.caption(f"Messages {start + 1}-{end} of {len(history)}")
+            older, newer = st.columns(2)
+            with older:
+                if page < num_pages - 1 and st.button("Older", key="history_older"):
+                    st.session_state.history_page = page + 1
+                    st.rerun()
+            with newer:
+                if page > 0 and st.button("Newer", key="history_newer"):
+                    st.session_state.history_page = page - 1
+                    st.rerun()
         if st.button("Clear History"):
-            chat_history.clear_chat_history()
+            chat_history.clear_chat_history(st.session_state.chat_path)
             st.session_state.chat_history = []
             st.rerun()
 
@@ -82,38 +145,36 @@ def main():
         pomodoro_duration = st.slider("Pomodoro Duration (minutes)", 5, 60, 25)
         if st.button("Start Pomodoro"):
             st.session_state.pomodoro_running = True
-            st.session_state.pomodoro_time = pomodoro_duration * 60
+            st.session_state.pomodoro_deadline = time.time() + pomodoro_duration * 60
         if st.button("Stop Pomodoro"):
             st.session_state.pomodoro_running = False
         if st.session_state.pomodoro_running:
-            st.markdown('<div class="timer-container">', unsafe_allow_html=True)
-            st.write(f"Time Left: {st.session_state.pomodoro_time // 60}:{st.session_state.pomodoro_time % 60:02d}")
-            st.markdown('</div>', unsafe_allow_html=True)
-            time.sleep(1)
-            st.session_state.pomodoro_time -= 1
-            if st.session_state.pomodoro_time <= 0:
+            remaining = st.session_state.pomodoro_deadline - time.time()
+            if remaining <= 0:
                 st.session_state.pomodoro_running = False
                 st.success("Pomodoro session complete!")
-            st.rerun()
+            else:
+                # The countdown ticks in the browser; the server only renders it once
+                components.html(pomodoro_countdown_html(remaining), height=60)
 
         st.header("Reminders")
         reminder_text = st.text_input("Set Reminder", placeholder="e.g., Study algorithms at 7 PM")
         if st.button("Add Reminder"):
             if reminder_text.strip():
                 st.session_state.chat_history.append(("Reminder", reminder_text))
-                chat_history.save_chat_history(st.session_state.chat_history)
+                chat_history.save_chat_history(st.session_state.chat_history, st.session_state.chat_path)
                 st.success("Reminder added!")
                 st.rerun()
 
         st.header("Mock Interview")
         if st.button("Attempt Your Mock Interview Now"):
-            interview_script = os.path.join(os.path.dirname(__file__), "interview.py")
-            port = 8502
-            cmd = f"streamlit run {interview_script} --server.port {port}"
-            os.system(cmd)
-            webbrowser.open(f"http://localhost:{port}")
+            # Starts the interview server once in the background (or reuses it) and opens
+            # the browser when it passes its health check; this returns immediately
+            interview_server = process_manager.get_interview_server()
+            interview_server.ensure_running()
+            interview_server.open_when_ready(f"/?user={user_id}")
             st.session_state.chat_history.append(("Assistant", f"Started {st.session_state.get('company', 'Mock')} {st.session_state.get('role', 'Interview')} Mock Interview in a new window."))
-            chat_history.save_chat_history(st.session_state.chat_history)
+            chat_history.save_chat_history(st.session_state.chat_history, st.session_state.chat_path)
             st.rerun()
 
     # Input section
@@ -131,26 +192,28 @@ def main():
         
         with st.spinner("Processing..."):
             st.session_state.chat_history.append(("You", user_input))
+            st.session_state.history_page = 0  # Show the newest messages again
+            st.session_state.chat_window = CHAT_PAGE_SIZE
             st.session_state.current_input_type = input_type
             st.session_state.quiz_submitted = False
             if input_type == "Question":
-                response = study_assistant.generate_response(user_input, st.session_state.model_name)
+                response = render_stream(study_assistant.generate_response_stream(user_input, st.session_state.model_name))
                 st.session_state.chat_history.append(("Assistant", response))
                 st.session_state.debug_response = response
             elif input_type == "Goal":
-                response = study_assistant.generate_study_plan(user_input, st.session_state.model_name)
+                response = render_stream(study_assistant.generate_study_plan_stream(user_input, st.session_state.model_name))
                 st.session_state.chat_history.append(("Assistant (Study Plan)", response))
                 st.session_state.debug_response = response
             else:  # Interview Prep
                 company = None
                 if "for" in user_input.lower():
                     company = user_input.lower().split("for")[-1].strip()
-                response = study_assistant.generate_quiz(
+                response = render_stream(study_assistant.generate_quiz_stream(
                     topic=user_input,
                     model_name=st.session_state.model_name,
                     is_interview_prep=True,
                     company=company
-                )
+                ))
                 response_text = "\n".join([
                     f"Question: {q[0]}\n" + "\n".join(q[1]) + f"\nCorrect Answer: {q[2]}\nTip: {q[3] if q[3] else 'No tip provided'}\n"
                     for q in parse_quiz(response)
@@ -162,25 +225,17 @@ def main():
             st.session_state.awaiting_feedback = True
             st.session_state.last_input = user_input
             st.session_state.last_answer = response
-            chat_history.save_chat_history(st.session_state.chat_history)
+            chat_history.save_chat_history(st.session_state.chat_history, st.session_state.chat_path)
             st.rerun()
 
-    # Chat container
-    st.markdown('<div class="chat-container">', unsafe_allow_html=True)
-    for speaker, message in st.session_state.chat_history:
-        if speaker == "You":
-            st.markdown(f'<div class="chat-message user-message">{message}</div>', unsafe_allow_html=True)
-        elif speaker == "Assistant (after web search)":
-            st.markdown(f'<div class="chat-message assistant-web-message">{message}</div>', unsafe_allow_html=True)
-        elif speaker == "Assistant (Study Plan)":
-            st.markdown(f'<div class="chat-message assistant-plan-message">{message}</div>', unsafe_allow_html=True)
-        elif speaker == "Assistant (Quiz)":
-            st.markdown(f'<div class="chat-message assistant-quiz-message">{message}</div>', unsafe_allow_html=True)
-        elif speaker == "Reminder":
-            st.markdown(f'<div class="chat-message assistant-message">Reminder: {message}</div>', unsafe_allow_html=True)
-        else:
-            st.markdown(f'<div class="chat-message assistant-message">{message}</div>', unsafe_allow_html=True)
-    st.markdown('</div>', unsafe_allow_html=True)
+    # Chat container: only the most recent messages are rendered
+    history = st.session_state.chat_history
+    window = st.session_state.get("chat_window", CHAT_PAGE_SIZE)
+    if len(history) > window:
+        if st.button(f"Load older messages ({len(history) - window} hidden)"):
+            st.session_state.chat_window = window + CHAT_PAGE_SIZE
+            st.rerun()
+    render_chat(history, window)
 
     # Interactive quiz answering
     if st.session_state.current_quiz and st.session_state.current_input_type == "Interview Prep" and not st.session_state.quiz_submitted:
@@ -212,10 +267,11 @@ def main():
                 company="Mock" if "company" not in st.session_state else st.session_state.company,
                 role="Software Engineer",
                 score=score,
-                total_questions=len(questions)
+                total_questions=len(questions),
+                user_id=user_id
             )
             st.session_state.chat_history.append(("Assistant (Quiz Results)", f"Score: {score}/{len(questions)}"))
-            chat_history.save_chat_history(st.session_state.chat_history)
+            chat_history.save_chat_history(st.session_state.chat_history, st.session_state.chat_path)
             st.rerun()
 
     # Feedback mechanism
@@ -226,27 +282,31 @@ def main():
             if st.button("Yes"):
                 st.session_state.awaiting_feedback = False
                 st.success("Thank you for your feedback!")
-                chat_history.save_chat_history(st.session_state.chat_history)
+                chat_history.save_chat_history(st.session_state.chat_history, st.session_state.chat_path)
                 st.rerun()
         with col2:
             if st.button("No"):
                 with st.spinner("Generating a better response..."):
                     if st.session_state.current_input_type == "Question":
-                        response = study_assistant.generate_response(st.session_state.last_input, st.session_state.model_name)
+                        response = render_stream(study_assistant.generate_response_stream(
+                            st.session_state.last_input, st.session_state.model_name, use_cache=False
+                        ))
                         st.session_state.chat_history.append(("Assistant (after feedback)", response))
                     elif st.session_state.current_input_type == "Goal":
-                        response = study_assistant.generate_study_plan(st.session_state.last_input, st.session_state.model_name)
+                        response = render_stream(study_assistant.generate_study_plan_stream(
+                            st.session_state.last_input, st.session_state.model_name, use_cache=False
+                        ))
                         st.session_state.chat_history.append(("Assistant (Study Plan after feedback)", response))
                     else:  # Interview Prep
                         company = None
                         if "for" in st.session_state.last_input.lower():
                             company = st.session_state.last_input.lower().split("for")[-1].strip()
-                        response = study_assistant.generate_quiz(
+                        response = render_stream(study_assistant.generate_quiz_stream(
                             topic=st.session_state.last_input,
                             model_name=st.session_state.model_name,
                             is_interview_prep=True,
                             company=company
-                        )
+                        ))
                         response_text = "\n".join([
                             f"Question: {q[0]}\n" + "\n".join(q[1]) + f"\nCorrect Answer: {q[2]}\nTip: {q[3] if q[3] else 'No tip provided'}\n"
                             for q in parse_quiz(response)
@@ -256,12 +316,32 @@ def main():
                         st.session_state.quiz_answers = {}
                     st.session_state.last_answer = response
                     st.session_state.debug_response = response
-                    chat_history.save_chat_history(st.session_state.chat_history)
+                    chat_history.save_chat_history(st.session_state.chat_history, st.session_state.chat_path)
                     st.rerun()
 
     # Debug info
     with st.expander("Debug Info"):
         st.write(f"Raw response: {st.session_state.debug_response}")
+        st.write("Loaded resources (shared across sessions):")
+        st.table(model_registry.registry.report())
+        st.write(f"Model memory: {model_registry.registry.memory_stats()}")
+        batching_stats = batching.stats()
+        if batching_stats:
+            st.write("Generation batching:")
+            st.table(batching_stats)
+        st.write(f"Response cache: {response_cache.get_cache().stats()}")
+        # The health check is an HTTP round trip; only run it when asked, not on every rerun
+        check_health = st.button("Check interview server health", key="debug_check_health")
+        st.write(f"Interview server: {process_manager.get_interview_server().status(check_health=check_health)}")
+        st.write("Startup timings:")
+        st.table(startup.report())
+
+    # Load models in the background now that the first frame is drawn
+    startup.prewarm([
+        study_assistant.load_embedding_model,
+        study_assistant.load_faiss_index,
+        partial(study_assistant.load_model, st.session_state.model_name)
+    ])
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,160 @@
+import os
+import json
+import time
+import weakref
+import threading
+from collections import deque
+from concurrent.futures import Future
+import numpy as np
+
+# Concurrent generate calls for the same pipeline and settings are merged into one padded batch.
+# Callers block while they wait, so a batch can only be as large as the number of threads
+# generating at once (api_server sizes its pool to MAX_BATCH_SIZE). The Streamlit app streams
+# tokens through streaming.py, which does not go through the batcher.
+BATCHING = os.environ.get("GENERATION_BATCHING", "1").lower() in ("1", "true", "yes")
+MAX_BATCH_SIZE = int(os.environ.get("BATCH_MAX_SIZE", "8"))
+MAX_WAIT_MS = float(os.environ.get("BATCH_MAX_WAIT_MS", "20"))  # How long the first request waits for company
+IDLE_TIMEOUT = 60  # seconds before an idle worker thread exits (restarted on the next request)
+METRICS_WINDOW = 512  # Recent requests kept for delay percentiles and throughput
+
+class _Request:
+    def __init__(self, generator, prompt, kwargs, key):
+        self.generator = generator  # Held by the request, not the batcher, so evicted models can be freed
+        self.prompt = prompt
+        self.kwargs = kwargs
+        self.key = key
+        self.enqueued = time.monotonic()
+        self.future = Future()
+
+class MicroBatcher:
+    """Dynamic micro-batching in front of one transformers pipeline.
+
+    Requests wait at most `max_wait` seconds (measured from the oldest one) for others with
+    identical generation settings; up to `max_batch_size` of them then run as a single
+    padded pipeline call and each caller receives its own output.
+    """
+
+    def __init__(self, name, max_batch_size=MAX_BATCH_SIZE, max_wait=MAX_WAIT_MS / 1000):
+        self.name = name
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._pending = []
+        self._cond = threading.Condition()
+        self._worker = None
+        self._delays = deque(maxlen=METRICS_WINDOW)  # (completed_at, queue delay seconds)
+        self.requests = 0
+        self.batches = 0
+
+    def generate(self, generator, prompt, **kwargs):
+        """Queue one prompt and block until its batch has run; returns the pipeline output for it."""
+        key = json.dumps(kwargs, sort_keys=True, default=str)
+        request = _Request(generator, prompt, kwargs, key)
+        with self._cond:
+            self._pending.append(request)
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name=f"batcher-{self.name}", daemon=True)
+                self._worker.start()
+            self._cond.notify()
+        return request.future.result()
+
+    def _next_batch(self):
+        """Wait for the oldest request's window to close (or a full batch) and take its batch."""
+        with self._cond:
+            idle_since = time.monotonic()
+            while not self._pending:
+                if time.monotonic() - idle_since > IDLE_TIMEOUT:
+                    self._worker = None
+                    return None
+                self._cond.wait(IDLE_TIMEOUT)
+            first = self._pending[0]
+            deadline = first.enqueued + self.max_wait
+            while True:
+                batch = [r for r in self._pending if r.key == first.key][:self.max_batch_size]
+                remaining = deadline - time.monotonic()
+                if len(batch) >= self.max_batch_size or remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            taken = set(map(id, batch))
+            self._pending = [r for r in self._pending if id(r) not in taken]
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            self._run_batch(batch)
+            del batch  # Do not keep the pipeline alive while idle
+
+    def _run_batch(self, batch):
+        started = time.monotonic()
+        generator = batch[0].generator
+        try:
+            if len(batch) == 1:
+                outputs = [generator(batch[0].prompt, **batch[0].kwargs)]
+            else:
+                outputs = generator([r.prompt for r in batch], batch_size=len(batch), **batch[0].kwargs)
+            for request, output in zip(batch, outputs):
+                # Some pipelines flatten batched single-sequence outputs; callers expect a list per prompt
+                request.future.set_result([output] if isinstance(output, dict) else output)
+        except Exception as e:
+            print(f"Error generating batch of {len(batch)} for {self.name}: {e}")
+            for request in batch:
+                if not request.future.done():
+                    request.future.set_exception(e)
+        completed = time.monotonic()
+        with self._cond:
+            self.requests += len(batch)
+            self.batches += 1
+            self._delays.extend((completed, started - r.enqueued) for r in batch)
+
+    def stats(self):
+        """Throughput, batch size and queueing delay over recent requests."""
+        with self._cond:
+            delays = list(self._delays)
+            requests, batches, queued = self.requests, self.batches, len(self._pending)
+        waits = np.array([d for _, d in delays]) * 1000
+        span = delays[-1][0] - delays[0][0] if len(delays) > 1 else 0.0
+        return {
+            "model": self.name,
+            "requests": requests,
+            "batches": batches,
+            "mean_batch_size": round(requests / batches, 2) if batches else 0.0,
+            "queued": queued,
+            "queue_delay_p50_ms": round(float(np.percentile(waits, 50)), 1) if len(waits) else 0.0,
+            "queue_delay_p95_ms": round(float(np.percentile(waits, 95)), 1) if len(waits) else 0.0,
+            "throughput_rps": round(len(delays) / span, 2) if span > 0 else 0.0,
+        }
+
+_batchers = weakref.WeakKeyDictionary()  # pipeline -> MicroBatcher; entries go when the model is unloaded
+_batchers_lock = threading.Lock()
+
+def _prepare(generator):
+    """Batched decoder-only generation needs a pad token and left padding."""
+    tokenizer = generator.tokenizer
+    if tokenizer.pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
+    if not generator.model.config.is_encoder_decoder:
+        tokenizer.padding_side = "left"
+
+def get_batcher(generator):
+    """The micro-batcher for a pipeline, created on first use."""
+    with _batchers_lock:
+        batcher = _batchers.get(generator)
+        if batcher is None:
+            _prepare(generator)
+            name = getattr(generator.model, "name_or_path", None) or type(generator.model).__name__
+            batcher = _batchers[generator] = MicroBatcher(name)
+        return batcher
+
+def generate(generator, prompt, **kwargs):
+    """Run `generator(prompt, **kwargs)`, batched with concurrent identical-settings calls when enabled."""
+    if not BATCHING or MAX_BATCH_SIZE <= 1:
+        return generator(prompt, **kwargs)
+    return get_batcher(generator).generate(generator, prompt, **kwargs)
+
+def stats():
+    """Metrics for every live batcher."""
+    with _batchers_lock:
+        batchers = list(_batchers.values())
+    return [batcher.stats() for batcher in batchers]
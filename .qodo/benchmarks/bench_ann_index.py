@@ -0,0 +1,86 @@
+"""Recall-vs-latency benchmark for the FAISS index types in vector_index.
+
+Run from the .qodo directory:
+    python -m benchmarks.bench_ann_index --sizes 10000 100000 1000000
+"""
+import argparse
+import time
+import numpy as np
+import faiss
+import vector_index
+
+def synthetic_vectors(num_vectors, dimension, num_clusters=256, seed=0):
+    """Clustered unit vectors, closer to sentence embeddings than uniform noise."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((num_clusters, dimension)).astype(np.float32)
+    vectors = np.empty((num_vectors, dimension), dtype=np.float32)
+    for start in range(0, num_vectors, 100000):
+        end = min(start + 100000, num_vectors)
+        labels = rng.integers(0, num_clusters, end - start)
+        vectors[start:end] = centers[labels] + 0.5 * rng.standard_normal((end - start, dimension)).astype(np.float32)
+    return vector_index.normalize(vectors)
+
+def recall_at_k(ground_truth, found):
+    """Fraction of the exact top-k neighbours that the index returned."""
+    hits = sum(len(set(gt) & set(f)) for gt, f in zip(ground_truth, found))
+    return hits / ground_truth.size
+
+def query_latencies(index, queries, k):
+    """Per-query latencies in milliseconds (one query per search call, as in the app)."""
+    latencies = []
+    for q in queries:
+        start = time.perf_counter()
+        index.search(q.reshape(1, -1), k)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return np.array(latencies)
+
+def run(sizes, index_types, dimension=384, num_queries=200, k=10, nprobe=vector_index.NPROBE,
+        ef_search=vector_index.EF_SEARCH):
+    """Benchmark every index type at every corpus size and return the result rows."""
+    results = []
+    for size in sizes:
+        data = synthetic_vectors(size, dimension)
+        queries = synthetic_vectors(num_queries, dimension, seed=1)
+        flat = faiss.IndexFlatL2(dimension)
+        flat.add(data)
+        _, ground_truth = flat.search(queries, k)
+        for index_type in index_types:
+            start = time.perf_counter()
+            index = vector_index.build_index(data, index_type)
+            build_seconds = time.perf_counter() - start
+            vector_index.configure_search(index, nprobe=nprobe, ef_search=ef_search)
+            _, found = index.search(queries, k)
+            latencies = query_latencies(index, queries, k)
+            row = {
+                "size": size,
+                "index_type": index_type,
+                "build_s": round(build_seconds, 2),
+                f"recall@{k}": round(recall_at_k(ground_truth, found), 4),
+                "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+                "p99_ms": round(float(np.percentile(latencies, 99)), 3),
+            }
+            results.append(row)
+            print(row)
+            del index
+        del flat, data
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark FAISS index types on synthetic vectors.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--index-types", nargs="+", choices=vector_index.INDEX_TYPES, default=list(vector_index.INDEX_TYPES))
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, default=vector_index.NPROBE)
+    parser.add_argument("--ef-search", type=int, default=vector_index.EF_SEARCH)
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.index_types, args.dimension, args.queries, args.k, args.nprobe, args.ef_search)
+    print(f"\n{'size':>9} {'index':>9} {'build_s':>8} {'recall':>7} {'p50_ms':>8} {'p99_ms':>8}")
+    for row in results:
+        print(f"{row['size']:>9} {row['index_type']:>9} {row['build_s']:>8} {row[f'recall@{args.k}']:>7} "
+              f"{row['p50_ms']:>8} {row['p99_ms']:>8}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,374 @@
+"""Latency, throughput and peak memory of the app's hot paths, fully offline.
+
+Models are replaced by deterministic stubs (a hashed bag-of-words embedder and a canned
+MCQ generator) loaded through model_registry, the FAISS index is built over a synthetic
+corpus of interview-style documents, and every store lives in a temporary directory, so
+the numbers measure our own retrieval, parsing and storage code rather than the network
+or a transformer.
+
+Run from the .qodo directory:
+    python -m benchmarks.bench_hot_paths --sizes 1000 10000 100000 --save-baseline
+    python -m benchmarks.bench_hot_paths --sizes 1000 10000 100000   # compare with the baseline
+
+Compare mode exits with status 1 when any case's p50 latency grew by more than --tolerance,
+its throughput fell by more than --throughput-tolerance, or its peak memory grew by more
+than --memory-tolerance against the baseline. Baselines are machine-specific: record one on
+the machine that runs the comparison.
+"""
+import os
+import sys
+import json
+import time
+import zlib
+import shutil
+import argparse
+import resource
+import tempfile
+import tracemalloc
+import contextlib
+import numpy as np
+from datetime import datetime, timedelta
+
+os.environ.setdefault("STUDY_ASSISTANT_OFFLINE", "1")  # Web lookups only hit the (empty) cache
+
+import model_registry
+import inference_backend  # Imported lazily by model_registry; load it before run() leaves this directory
+import study_assistant
+import quiz_generator
+import question_bank
+import chat_history
+import performance_store
+import document_store
+import vector_index
+import app  # Only for parse_quiz; the Streamlit UI runs from main() and is not started
+from context_packer import build_packed_prompt
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline_hot_paths.json")
+DIMENSION = 384  # all-MiniLM-L6-v2
+COMPANY, ROLE = "Meta", "Software Engineer"
+MODEL_NAME = "t5-small"  # Context window the retrieval cases pack into
+MAX_NEW_TOKENS = 150  # generate_response's default
+TOPICS = [
+    "binary search tree", "hash table", "dynamic programming", "graph traversal", "load balancer",
+    "message queue", "distributed cache", "rate limiter", "news feed", "consistent hashing",
+    "linked list", "heap", "trie", "sharding", "replication", "garbage collection", "TCP handshake",
+    "deadlock", "mutex", "REST API", "database index", "MapReduce", "bloom filter", "LRU cache",
+]
+STEMS = [
+    "Explain how a {} works and when you would use it.",
+    "Design a system that relies on a {} at scale.",
+    "Write a function that implements a {}.",
+    "How would you debug a slow {} in production?",
+    "Tell me about a time you used a {} to solve a problem.",
+]
+FILLER = (
+    "Interviewers expect a clear explanation of the trade-offs, the time and space complexity, "
+    "the failure modes and how the design changes as traffic grows by an order of magnitude."
+).split()
+
+class StubTokenizer:
+    """Whitespace tokenizer with the slice of the transformers API that context packing uses."""
+
+    pad_token = eos_token = "</s>"
+    model_max_length = 512
+
+    def __init__(self):
+        self._words = {}
+
+    def __call__(self, text, add_special_tokens=True, **kwargs):
+        ids = []
+        for word in text.split():
+            ids.append(self._words.setdefault(word, len(self._words)))
+        return {"input_ids": ids}
+
+    def decode(self, ids, skip_special_tokens=True):
+        words = {i: w for w, i in self._words.items()}
+        return " ".join(words[i] for i in ids)
+
+class StubConfig:
+    is_encoder_decoder = True
+
+class StubModel:
+    name_or_path = "stub-t5"
+    config = StubConfig()
+
+class StubGenerator:
+    """Generator shaped like t5-small's text2text pipeline: a well-formed MCQ or numbered question list per prompt.
+
+    Like the real pipeline, a single prompt returns [{"generated_text": ...}] and a list of
+    prompts returns one flat dict per prompt (not a list per prompt as text-generation does).
+    """
+
+    def __init__(self):
+        self.tokenizer = StubTokenizer()
+        self.model = StubModel()
+
+    def _complete(self, prompt):
+        seed = zlib.crc32(prompt.encode("utf-8"))
+        topic = TOPICS[seed % len(TOPICS)]
+        if "numbered list" in prompt:
+            return " ".join(f"{i + 1}. {STEMS[(seed + i) % len(STEMS)].format(TOPICS[(seed + i) % len(TOPICS)])}"
+                            for i in range(50))
+        return (
+            f"Question: What is the main trade-off of a {topic}?\n"
+            f"Options:\n1) Memory for speed\n2) Nothing\n3) Only latency\n4) Only cost\n"
+            f"Correct Answer: 1) Memory for speed\n"
+            f"Explanation: A {topic} spends memory or coordination to reduce lookup time."
+        )
+
+    def __call__(self, prompts, **kwargs):
+        if isinstance(prompts, str):
+            return [{"generated_text": self._complete(prompts)}]
+        return [{"generated_text": self._complete(p)} for p in prompts]
+
+class StubEmbedder:
+    """Deterministic hashed set-of-words sentence embedder (unit vectors, like MiniLM's).
+
+    Binary word presence puts a query's best matches around 0.5-0.6 cosine similarity,
+    so retrieval thresholds are crossed about as often as with the real model.
+    """
+
+    def encode(self, texts, show_progress_bar=False, **kwargs):
+        vectors = np.zeros((len(texts), DIMENSION), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in {w.strip(".,?!:()") for w in text.lower().split()}:
+                vectors[row, zlib.crc32(word.encode("utf-8")) % DIMENSION] = 1.0
+        return vector_index.normalize(vectors)
+
+def synthetic_documents(size, seed=0):
+    """Interview-style study chunks of roughly 60-120 words, the size the scraper stores."""
+    rng = np.random.default_rng(seed)
+    documents = []
+    for i in range(size):
+        topic = TOPICS[rng.integers(len(TOPICS))]
+        stem = STEMS[rng.integers(len(STEMS))].format(topic)
+        filler = " ".join(rng.choice(FILLER, size=int(rng.integers(50, 110))))
+        documents.append(f"{COMPANY} {ROLE} interview questions 2025: {stem} {filler} (#{i})")
+    return documents
+
+def mcq_entry(i):
+    return {
+        "question": f"{STEMS[i % len(STEMS)].format(TOPICS[i % len(TOPICS)])} (#{i})",
+        "options": ["1) Memory for speed", "2) Nothing", "3) Only latency", "4) Only cost"],
+        "correct_answer": "1) Memory for speed",
+        "explanation": "Stub explanation.",
+    }
+
+def install_stubs(size, workdir):
+    """Point model_registry at stub models and a FAISS index over `size` synthetic documents."""
+    documents = synthetic_documents(size)
+    embedder = StubEmbedder()
+    index = vector_index.build_index(embedder.encode(documents))
+    docs_path = os.path.join(workdir, f"documents-{size}")
+    document_store.write_documents(documents, docs_path)
+    store = document_store.DocumentStore(docs_path)
+    generator = StubGenerator()
+    model_registry.registry = model_registry.ResourceRegistry(max_bytes=0)  # Fresh resources per size
+    model_registry._load_generator = lambda model_name, backend=None: generator
+    model_registry._load_embedding_model = lambda name: embedder
+    model_registry._load_faiss_index = lambda index_path, docs_path: (index, store)
+
+def measure(name, size, op, repeat):
+    """Time `repeat` calls of op(i), then trace one more call for peak Python allocations."""
+    latencies = []
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        op(-1)  # Warm-up: first-use loads and connections are not part of the steady state
+        start = time.perf_counter()
+        for i in range(repeat):
+            t = time.perf_counter()
+            op(i)
+            latencies.append((time.perf_counter() - t) * 1000)
+        total = time.perf_counter() - start
+        tracemalloc.start()
+        op(repeat)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    latencies = np.array(latencies)
+    row = {
+        "case": name,
+        "size": size,
+        "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 3),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 3),
+        "ops_per_s": round(repeat / total, 1) if total > 0 else 0.0,
+        "peak_kb": round(peak / 1024, 1),
+    }
+    print(row)
+    return row
+
+def cases(size):
+    """(name, op) pairs for one data size; each op takes the iteration number."""
+    queries = [stem.format(topic) for stem in STEMS for topic in TOPICS]
+    user_id = f"bench-{size}"
+    bank_role = f"{ROLE} {size}"  # Its own pair, so each size draws from exactly `size` banked questions
+    chat_path = f"chat-{size}.jsonl"
+    history = [("You" if i % 2 == 0 else "Assistant", f"Message {i}: " + " ".join(FILLER[:i % 30 + 5])) for i in range(size)]
+    chat_history.save_chat_history(history, chat_path)
+    start = datetime(2025, 1, 1)
+    records = [
+        {"company": question_bank.COMPANIES[i % len(question_bank.COMPANIES)], "role": question_bank.ROLES[i % len(question_bank.ROLES)],
+         "score": i % 11, "total_questions": 10, "timestamp": (start + timedelta(minutes=i)).strftime("%Y-%m-%d %H:%M:%S")}
+        for i in range(size)
+    ]
+    performance_store.get_store(user_id).add_many(records)
+    question_bank.get_bank().add(COMPANY, bank_role, [mcq_entry(i) for i in range(size)])
+
+    def generate_quiz_live(i):
+        quiz_generator.USE_QUESTION_BANK = False
+        try:
+            quiz_generator.generate_quiz("BenchCorp", ROLE, 10)
+        finally:
+            quiz_generator.USE_QUESTION_BANK = True
+
+    def retrieve_and_pack(i):
+        # generate_response's path up to generation: retrieval, then packing into the t5-small window
+        query = queries[i % len(queries)]
+        generator = model_registry.get_generator(MODEL_NAME)
+        return build_packed_prompt(lambda context: study_assistant._response_prompt(query, MODEL_NAME, context),
+                                   study_assistant.retrieve_chunks(query), generator.tokenizer, MODEL_NAME, MAX_NEW_TOKENS)
+
+    def save_chat(i):
+        history.append(("You", f"New message {i}"))
+        chat_history.save_chat_history(history, chat_path)
+
+    return [
+        ("retrieve_chunks+pack", retrieve_and_pack),
+        ("fetch_interview_questions", lambda i: quiz_generator.fetch_interview_questions(COMPANY, ROLE, 50)),
+        ("generate_quiz[live]", generate_quiz_live),
+        ("generate_quiz[bank]", lambda i: quiz_generator.generate_quiz(COMPANY, bank_role, 10)),
+        ("save_chat_history", save_chat),
+        ("load_chat_history", lambda i: chat_history.load_chat_history(chat_path)),
+        ("load_chat_history[tail]", lambda i: chat_history.load_chat_history(chat_path, last_n=20)),
+        ("save_performance", lambda i: quiz_generator.save_performance(COMPANY, ROLE, i % 11, 10, user_id=user_id)),
+        ("load_performance", lambda i: quiz_generator.load_performance(COMPANY, ROLE, user_id=user_id)),
+    ]
+
+def quiz_text(num_questions):
+    """Chat quiz text in the format study_assistant.generate_quiz asks the model for."""
+    return "\n".join(
+        f"Question: {mcq_entry(i)['question']}\n1) Memory for speed\n2) Nothing\n3) Only latency\n4) Only cost\n"
+        f"Correct Answer: 1) Memory for speed\nTip: Name the trade-off first."
+        for i in range(num_questions)
+    )
+
+def parse_cases():
+    """The quiz parsers over 50-question quizzes, and packing of web-page-sized chunks; independent of corpus size."""
+    generator = StubGenerator()
+    responses = [(generator._complete(f"prompt {i}"), mcq_entry(i)["question"]) for i in range(50)]
+    text = quiz_text(50)
+    # Three full-size web results ranked below one FAISS match, as retrieve_chunks returns them offline
+    page = " ".join(synthetic_documents(60, seed=1))[:study_assistant.WEB_RESULT_CHARS]
+    chunks = [(synthetic_documents(1)[0], 0.6)] + [(page, -1.0 - rank) for rank in range(3)]
+    prompt = lambda context: study_assistant._response_prompt("What is a bloom filter?", MODEL_NAME, context)
+    return [
+        ("parse_quiz_response[50]", lambda i: [quiz_generator.parse_quiz_response(r, q, COMPANY) for r, q in responses]),
+        ("parse_quiz[50]", lambda i: app.parse_quiz(text)),
+        ("build_packed_prompt[web]", lambda i: build_packed_prompt(prompt, chunks, generator.tokenizer, MODEL_NAME, MAX_NEW_TOKENS)),
+    ]
+
+def check_outputs():
+    """Fail fast if a stubbed path only measured its error fallback (e.g. N/A placeholder questions)."""
+    quiz_generator.USE_QUESTION_BANK = False
+    try:
+        quiz = quiz_generator.generate_quiz("BenchCorp", ROLE, 5)
+    finally:
+        quiz_generator.USE_QUESTION_BANK = True
+    failed = [entry["question"] for entry in quiz if entry["correct_answer"] == "N/A"]
+    if not quiz or failed:
+        raise RuntimeError(f"generate_quiz fell back to placeholders for {len(failed)} of {len(quiz)} questions")
+
+def run(sizes, repeat=50):
+    """Benchmark every hot path at every size inside a scratch directory; returns the rows."""
+    results = []
+    cwd = os.getcwd()
+    workdir = tempfile.mkdtemp(prefix="bench_hot_paths_")
+    try:
+        os.chdir(workdir)  # data/, chat logs and per-user stores are all relative paths
+        for name, op in parse_cases():
+            results.append(measure(name, None, op, repeat))
+        for size in sizes:
+            start = time.perf_counter()
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                install_stubs(size, workdir)
+                check_outputs()
+                size_cases = cases(size)
+            print(f"[DEBUG] Prepared size {size} in {time.perf_counter() - start:.1f}s")
+            for name, op in size_cases:
+                results.append(measure(name, size, op, repeat))
+            del size_cases
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+def _change(row, before, metric):
+    """Relative change of `metric` against the baseline row, or None without a usable baseline."""
+    if not before or not before.get(metric):
+        return None
+    return round(row[metric] / before[metric] - 1, 3)
+
+def compare(results, baseline, tolerance, throughput_tolerance=0.2, memory_tolerance=0.25):
+    """Rows annotated with p50, throughput and peak memory changes against the baseline.
+
+    Returns (rows, regressions) where regressions lists (row, metric) pairs.
+    """
+    previous = {(row["case"], row["size"]): row for row in baseline["results"]}
+    rows, regressions = [], []
+    for row in results:
+        before = previous.get((row["case"], row["size"]))
+        changes = {metric: _change(row, before, metric) for metric in ("p50_ms", "ops_per_s", "peak_kb")}
+        # Sub-50us and sub-16KB differences are timer and allocator noise, not regressions
+        if changes["p50_ms"] is not None and changes["p50_ms"] > tolerance and row["p50_ms"] - before["p50_ms"] > 0.05:
+            regressions.append((row, "p50_ms"))
+        if changes["ops_per_s"] is not None and changes["ops_per_s"] < -throughput_tolerance \
+                and 1000 / row["ops_per_s"] - 1000 / before["ops_per_s"] > 0.05:
+            regressions.append((row, "ops_per_s"))
+        if changes["peak_kb"] is not None and changes["peak_kb"] > memory_tolerance and row["peak_kb"] - before["peak_kb"] > 16:
+            regressions.append((row, "peak_kb"))
+        rows.append(dict(row, p50_change=changes["p50_ms"], ops_change=changes["ops_per_s"], peak_change=changes["peak_kb"]))
+    return rows, regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the app's hot paths offline with stub models.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="Corpus documents, chat messages, performance records and banked questions")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="Write the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed p50 slowdown before flagging (0.2 = 20%%)")
+    parser.add_argument("--throughput-tolerance", type=float, default=0.2,
+                        help="Allowed drop in ops/s before flagging (0.2 = 20%%)")
+    parser.add_argument("--memory-tolerance", type=float, default=0.25,
+                        help="Allowed growth in traced peak memory before flagging (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.repeat)
+    peak_rss_mb = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump({"created": time.strftime("%Y-%m-%d %H:%M:%S"), "python": sys.version.split()[0],
+                       "peak_rss_mb": peak_rss_mb, "results": results}, f, indent=2)
+        print(f"Saved baseline to {args.baseline}")
+
+    regressions = []
+    rows = [dict(row, p50_change=None, ops_change=None, peak_change=None) for row in results]
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, "r") as f:
+            rows, regressions = compare(results, json.load(f), args.tolerance,
+                                        args.throughput_tolerance, args.memory_tolerance)
+
+    fmt = lambda change: "-" if change is None else f"{change:+.0%}"
+    print(f"\n{'case':>26} {'size':>7} {'p50_ms':>9} {'p95_ms':>9} {'p99_ms':>9} {'ops/s':>9} {'peak_kb':>9} "
+          f"{'p50 vs':>7} {'ops vs':>7} {'mem vs':>7}")
+    for row in rows:
+        print(f"{row['case']:>26} {str(row['size'] or '-'):>7} {row['p50_ms']:>9} {row['p95_ms']:>9} {row['p99_ms']:>9} "
+              f"{row['ops_per_s']:>9} {row['peak_kb']:>9} {fmt(row['p50_change']):>7} {fmt(row['ops_change']):>7} "
+              f"{fmt(row['peak_change']):>7}")
+    print(f"\nPeak RSS: {peak_rss_mb} MB")
+    if regressions:
+        print(f"{len(regressions)} regression(s): "
+              + ", ".join(f"{r['case']}@{r['size']} ({metric})" for r, metric in regressions))
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Throughput, peak memory and output agreement of the inference backends in inference_backend.
+
+Each backend runs in its own subprocess so peak RSS is measured in isolation. Outputs are
+greedy-decoded and compared token by token with the fp32 "torch" backend.
+
+Run from the .qodo directory:
+    python -m benchmarks.bench_inference_backend --models t5-small gpt2 --backends torch int8 onnx
+"""
+import sys
+import json
+import time
+import argparse
+import resource
+import subprocess
+import inference_backend
+
+PROMPTS = [
+    "Answer the question based on the context: What is a binary search tree?",
+    "Explain the difference between a process and a thread.",
+    "Create a 7-day study plan for learning dynamic programming.",
+    "Generate a multiple-choice question about hash tables.",
+    "What is the time complexity of merge sort and why?",
+    "Describe how TCP establishes a connection.",
+]
+
+def peak_rss_mb():
+    """Peak resident set size of this process (ru_maxrss is KiB on Linux)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def run_backend(model_name, backend, max_new_tokens):
+    """Generate every prompt with one backend and return timings plus the generated token ids."""
+    import torch
+    start = time.perf_counter()
+    model, tokenizer = inference_backend.load_model_and_tokenizer(model_name, backend)
+    load_seconds = time.perf_counter() - start
+    seq2seq = model_name in inference_backend.SEQ2SEQ_MODELS
+    pad_token_id = tokenizer.pad_token_id if tokenizer.pad_token_id is not None else tokenizer.eos_token_id
+
+    def generate(prompt):
+        inputs = tokenizer(prompt, return_tensors="pt", truncation=True, return_token_type_ids=False)
+        with torch.no_grad():
+            output = model.generate(**inputs, max_new_tokens=max_new_tokens, do_sample=False, pad_token_id=pad_token_id)
+        ids = output[0].tolist()
+        return ids if seq2seq else ids[inputs["input_ids"].shape[1]:]
+
+    generate(PROMPTS[0])  # Warm-up
+    outputs = []
+    start = time.perf_counter()
+    for prompt in PROMPTS:
+        outputs.append(generate(prompt))
+    seconds = time.perf_counter() - start
+    return {
+        "model": model_name,
+        "backend": inference_backend.resolve_backend(backend),
+        "load_s": round(load_seconds, 2),
+        "tokens_per_s": round(sum(len(ids) for ids in outputs) / seconds, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "outputs": outputs,
+    }
+
+def token_agreement(reference, candidate):
+    """Fraction of positions (over the longer sequence) where both outputs have the same token."""
+    length = max(len(reference), len(candidate))
+    if length == 0:
+        return 1.0
+    return sum(a == b for a, b in zip(reference, candidate)) / length
+
+def run_isolated(model_name, backend, max_new_tokens):
+    """Run one backend in a fresh interpreter and return its result row."""
+    completed = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_inference_backend", "--worker",
+         "--models", model_name, "--backends", backend, "--max-new-tokens", str(max_new_tokens)],
+        capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        print(f"Error benchmarking {model_name} on {backend}: {completed.stderr.strip()[-500:]}")
+        return None
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def run(models, backends, max_new_tokens=32):
+    """Benchmark every backend for every model and return the result rows."""
+    results = []
+    for model_name in models:
+        reference = None
+        for backend in backends:
+            row = run_isolated(model_name, backend, max_new_tokens)
+            if row is None:
+                continue
+            outputs = row.pop("outputs")
+            if backend == "torch":
+                reference = outputs
+            if reference is not None:
+                row["exact_match"] = round(sum(r == o for r, o in zip(reference, outputs)) / len(outputs), 3)
+                row["token_agreement"] = round(sum(token_agreement(r, o) for r, o in zip(reference, outputs)) / len(outputs), 3)
+            results.append(row)
+            print(row)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CPU inference backends for the generation models.")
+    parser.add_argument("--models", nargs="+", default=["t5-small", "gpt2"])
+    parser.add_argument("--backends", nargs="+", choices=inference_backend.BACKENDS, default=list(inference_backend.BACKENDS))
+    parser.add_argument("--max-new-tokens", type=int, default=32)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_backend(args.models[0], args.backends[0], args.max_new_tokens)))
+        return
+
+    backends = ["torch"] + [b for b in args.backends if b != "torch"]  # fp32 first, as the reference
+    results = run(args.models, backends, args.max_new_tokens)
+    print(f"\n{'model':>20} {'backend':>8} {'load_s':>7} {'tok/s':>8} {'rss_mb':>8} {'exact':>6} {'agree':>6}")
+    for row in results:
+        print(f"{row['model']:>20} {row['backend']:>8} {row['load_s']:>7} {row['tokens_per_s']:>8} "
+              f"{row['peak_rss_mb']:>8} {row.get('exact_match', '-'):>6} {row.get('token_agreement', '-'):>6}")
+
+if __name__ == "__main__":
+    main()
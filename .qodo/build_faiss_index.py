@@ -1,59 +1,182 @@
 import os
-import numpy as np
+import json
+import hashlib
+import argparse
+from datetime import datetime
 import faiss
 from sentence_transformers import SentenceTransformer
-from googlesearch import search
-import requests
-from bs4 import BeautifulSoup
-import pickle
+from vector_index import build_index, normalize, INDEX_TYPE, INDEX_TYPES
+from document_store import write_documents, append_documents, open_document_store
+from web_fetcher import MAX_WORKERS, PER_HOST_LIMIT
+from web_cache import cached_search, fetch_paragraphs
 
 # Initialize embedding model
 embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
 
-def scrape_study_materials(topics, num_results=5):
-    """Scrape study materials and interview questions for given topics."""
-    documents = []
+def _search_urls(topics, num_results):
+    """Lazily yield search result URLs for each topic."""
     for topic in topics:
         query = f"{topic} study material | interview questions 2025 site:*.edu | site:glassdoor.com | site:geeksforgeeks.org"
         try:
-            headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"}
-            for url in search(query, num_results=num_results):
-                try:
-                    response = requests.get(url, headers=headers, timeout=5)
-                    soup = BeautifulSoup(response.text, "html.parser")
-                    paragraphs = soup.find_all("p")
-                    text = " ".join([p.get_text().strip() for p in paragraphs if p.get_text().strip()])
-                    if text:
-                        documents.append(text[:1000])  # Limit to 1000 chars per document
-                except Exception as e:
-                    print(f"Error fetching {url}: {e}")
+            for url in cached_search(query, num_results=num_results):
+                yield url
         except Exception as e:
             print(f"Search error for {topic}: {e}")
-    return list(set(documents))  # Remove duplicates
 
-def build_faiss_index(documents, index_path="data/faiss_index", docs_path="data/documents.pkl"):
+def scrape_study_materials(topics, num_results=5, max_workers=MAX_WORKERS, per_host_limit=PER_HOST_LIMIT, deadline=300):
+    """Scrape study materials and interview questions for given topics.
+
+    Pages are served from the web cache or fetched concurrently and extracted as they arrive,
+    so ingest time scales with `max_workers` rather than with the number of URLs.
+    """
+    documents = []
+    seen = set()
+    for url, paragraphs, error in fetch_paragraphs(_search_urls(topics, num_results), max_workers=max_workers,
+                                                   per_host_limit=per_host_limit, deadline=deadline):
+        if error is not None:
+            print(f"Error fetching {url}: {error}")
+            continue
+        text = " ".join(paragraphs)[:1000]  # Limit to 1000 chars per document
+        if text and text not in seen:  # Remove duplicates, keep fetch order
+            seen.add(text)
+            documents.append(text)
+    return documents
+
+def document_hash(text):
+    """Content hash used to recognise documents that are already indexed."""
+    return hashlib.sha256(text.strip().encode("utf-8")).hexdigest()
+
+def load_manifest(manifest_path="data/manifest.jsonl"):
+    """Load the ingest manifest (one JSON line per build/update run)."""
+    runs = []
+    try:
+        with open(manifest_path, "r") as f:
+            for line in f:
+                try:
+                    runs.append(json.loads(line))
+                except ValueError:
+                    print(f"Skipping unreadable manifest line in {manifest_path}")  # e.g. torn by a crash
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"Error loading manifest: {e}")
+    return {"runs": runs}
+
+def indexed_hashes(manifest):
+    """Return the set of content hashes recorded across all manifest runs."""
+    return {h for run in manifest.get("runs", []) for h in run.get("hashes", [])}
+
+def _record_run(manifest_path, mode, added_hashes, skipped, total, fresh=False):
+    """Append a run (with only the hashes it added) to the manifest.
+
+    Earlier runs are never rewritten, so recording costs the size of the new run. A fresh
+    manifest (after a full build) is written via a temp file and replaces the old one.
+    """
+    record = json.dumps({
+        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "mode": mode,
+        "added": len(added_hashes),
+        "skipped": skipped,
+        "total_documents": total,
+        "hashes": added_hashes
+    })
+    os.makedirs(os.path.dirname(manifest_path) or ".", exist_ok=True)
+    if fresh:
+        tmp_path = f"{manifest_path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(record + "\n")
+        os.replace(tmp_path, manifest_path)
+    else:
+        with open(manifest_path, "a") as f:
+            f.write(record + "\n")
+
+def _save_index(index, index_path):
+    """Write the index via a temp file so readers never see a half-written index."""
+    os.makedirs(os.path.dirname(index_path) or ".", exist_ok=True)
+    faiss.write_index(index, f"{index_path}.tmp")
+    os.replace(f"{index_path}.tmp", index_path)
+
+def build_faiss_index(documents, index_path="data/faiss_index", docs_path="data/documents",
+                      manifest_path="data/manifest.jsonl", index_type=INDEX_TYPE):
     """Build and save FAISS index from documents."""
     if not documents:
         print("No documents to index.")
         return None, None
     
+    # Drop duplicates by content hash, keeping first occurrence
+    unique = {}
+    for doc in documents:
+        unique.setdefault(document_hash(doc), doc)
+    hashes, documents = list(unique.keys()), list(unique.values())
+    
     # Generate embeddings
     embeddings = embedding_model.encode(documents, show_progress_bar=True)
     
-    # Create FAISS index
-    dimension = embeddings.shape[1]  # Embedding dimension (384 for MiniLM)
-    index = faiss.IndexFlatL2(dimension)  # L2 distance for similarity search
-    index.add(np.array(embeddings, dtype=np.float32))
+    # Create, train and fill the FAISS index (L2 over normalised vectors)
+    index = build_index(embeddings, index_type)
     
-    # Save index and documents
-    os.makedirs("data", exist_ok=True)
-    faiss.write_index(index, index_path)
-    with open(docs_path, "wb") as f:
-        pickle.dump(documents, f)
+    # Save index and documents, then start a fresh manifest
+    write_documents(documents, docs_path)
+    _save_index(index, index_path)
+    _record_run(manifest_path, "full", hashes, 0, len(documents), fresh=True)
     
     return index, documents
 
+def update_faiss_index(documents, index_path="data/faiss_index", docs_path="data/documents",
+                       manifest_path="data/manifest.jsonl"):
+    """Incrementally add documents to an existing index, skipping anything already indexed.
+
+    Only unseen documents (by content hash) are encoded and appended, so the cost of a
+    refresh is proportional to the new content. Falls back to a full build if no index exists.
+    """
+    try:
+        index = faiss.read_index(index_path)
+        existing = open_document_store(docs_path)  # Converts a legacy documents.pkl if present
+    except Exception as e:
+        print(f"No existing index found ({e}), building from scratch.")
+        return build_faiss_index(documents, index_path, docs_path, manifest_path)
+    
+    known = indexed_hashes(load_manifest(manifest_path))
+    if not known and existing:
+        # Index predates the manifest: seed it from the stored documents
+        known = {document_hash(doc) for doc in existing}
+        _record_run(manifest_path, "seed", sorted(known), 0, len(existing))
+    
+    new_docs, new_hashes, skipped = [], [], 0
+    for doc in documents or []:
+        h = document_hash(doc)
+        if h in known:
+            skipped += 1
+            continue
+        known.add(h)
+        new_hashes.append(h)
+        new_docs.append(doc)
+    
+    if not new_docs:
+        print(f"No new documents to index ({skipped} already indexed).")
+        _record_run(manifest_path, "incremental", [], skipped, len(existing))
+        return index, existing
+    
+    embeddings = embedding_model.encode(new_docs, show_progress_bar=True)
+    index.add(normalize(embeddings))
+    
+    # Append to the document store before publishing the index, so every vector has a document
+    existing.close()
+    append_documents(new_docs, docs_path)
+    _save_index(index, index_path)
+    documents = open_document_store(docs_path)
+    _record_run(manifest_path, "incremental", new_hashes, skipped, len(documents))
+    print(f"Added {len(new_docs)} new documents, skipped {skipped} already indexed.")
+    return index, documents
+
 def main():
+    parser = argparse.ArgumentParser(description="Scrape study materials and build the FAISS index.")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Append only new documents to the existing index instead of rebuilding it")
+    parser.add_argument("--index-type", choices=INDEX_TYPES, default=INDEX_TYPE,
+                        help="FAISS index type for a full build (default: %(default)s)")
+    args = parser.parse_args()
+    
     # Define topics to scrape (customize based on your needs)
     topics = [
         "Python programming",
@@ -69,8 +192,12 @@ def main():
     print(f"Collected {len(documents)} unique documents.")
     
     # Build and save FAISS index
-    print("Building FAISS index...")
-    index, documents = build_faiss_index(documents)
+    if args.incremental:
+        print("Updating FAISS index incrementally...")
+        index, documents = update_faiss_index(documents)
+    else:
+        print("Building FAISS index...")
+        index, documents = build_faiss_index(documents, index_type=args.index_type)
     if index:
         print(f"FAISS index saved at data/faiss_index with {len(documents)} documents.")
 
@@ -1,33 +1,262 @@
 import json
 import os
+import time
+import atexit
+import threading
+from user_session import LRUCache
 
-def save_chat_history(history, filename="chat_history.json"):
-    """Save chat history to a JSON file."""
+# Chat history is an append-only JSONL log: one {"op": "add", "entry": [speaker, message]}
+# record per message and an {"op": "clear"} marker when the history is cleared. Saving
+# appends only the new messages; compaction drops everything before the last clear.
+HISTORY_PATH = "chat_history.jsonl"
+FSYNC_EVERY = 16  # fsync after this many appended records ...
+FSYNC_INTERVAL = 5.0  # ... or this many seconds, whichever comes first
+COMPACT_MIN_RECORDS = 1000  # Compact once this many dead records exceed the live ones
+TAIL_BLOCK_SIZE = 64 * 1024
+
+LOCK_STRIPES = 64
+
+# Saves for different users' logs proceed in parallel; only the same path is serialized
+_locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+_logs = LRUCache()  # path -> _LogState, bounded so idle users do not accumulate
+
+class _LogState:
+    """What this process knows about a log file, so saves can append just the delta."""
+
+    def __init__(self):
+        self.count = None  # Live entries in the log (None until loaded or written)
+        self.last_entry = None
+        # After a tail load the caller holds only the last `count` entries; older ones stay in the
+        # log untouched, so saves must append rather than rewrite
+        self.partial = False
+        self.dead = 0  # Records before the last clear marker
+        self.unsynced = 0
+        self.last_sync = time.monotonic()
+
+def _path_lock(path):
+    return _locks[hash(path) % LOCK_STRIPES]
+
+def _state(path):
+    return _logs.get_or_create(path, _LogState)
+
+def _record(op, entry=None):
+    record = {"op": op} if entry is None else {"op": op, "entry": list(entry)}
+    return json.dumps(record) + "\n"
+
+def _append_records(path, lines, state, force_sync=False):
+    """Append records, fsyncing in batches rather than on every write."""
+    with open(path, "a", encoding="utf-8") as f:
+        f.writelines(lines)
+        f.flush()
+        state.unsynced += len(lines)
+        if force_sync or state.unsynced >= FSYNC_EVERY or time.monotonic() - state.last_sync >= FSYNC_INTERVAL:
+            os.fsync(f.fileno())
+            state.unsynced = 0
+            state.last_sync = time.monotonic()
+
+def _write_snapshot(path, history, state):
+    """Atomically replace the log with just the live entries."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.writelines(_record("add", entry) for entry in history)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    state.count = len(history)
+    state.last_entry = list(history[-1]) if history else None
+    state.partial = False
+    state.dead = 0
+    state.unsynced = 0
+    state.last_sync = time.monotonic()
+
+def _read_records(path):
+    """Parse every record in the log, skipping a torn final line left by a crash."""
+    records = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return records
+
+def _truncate_torn_tail(path):
+    """Drop a partial last line (crash mid-append) so the next append starts on a fresh line."""
+    with open(path, "rb+") as f:
+        end = position = f.seek(0, os.SEEK_END)
+        while position > 0:
+            size = min(TAIL_BLOCK_SIZE, position)
+            f.seek(position - size)
+            newline = f.read(size).rfind(b"\n")
+            if newline != -1:
+                position = position - size + newline + 1
+                break
+            position -= size
+        if position != end:
+            f.truncate(position)
+
+def migrate_legacy(filename=HISTORY_PATH, legacy_path=None):
+    """Convert a chat_history.json array into the JSONL log (once); the old file is kept as .bak."""
+    legacy_path = legacy_path or os.path.splitext(filename)[0] + ".json"
+    if os.path.exists(filename) or not os.path.exists(legacy_path):
+        return False
     try:
-        with open(filename, "w") as f:
-            json.dump(history, f, indent=4)
+        with open(legacy_path, "r") as f:
+            history = json.load(f)
+        with _path_lock(filename):
+            _write_snapshot(filename, history, _state(filename))
+        os.replace(legacy_path, f"{legacy_path}.bak")
+        print(f"[DEBUG] Migrated {len(history)} chat entries from {legacy_path} to {filename}")
+        return True
+    except Exception as e:
+        print(f"[DEBUG] Error migrating chat history: {e}")
+        return False
+
+def compact_chat_history(filename=HISTORY_PATH):
+    """Rewrite the log without the records that precede the last clear."""
+    try:
+        with _path_lock(filename):
+            history = _live_entries(_read_records(filename)) if os.path.exists(filename) else []
+            state = _state(filename)
+            view = state.count, state.last_entry
+            _write_snapshot(filename, history, state)
+            if view[0] is not None and view[0] < len(history):
+                # The caller loaded only the tail; keep its view so later saves still append
+                state.count, state.last_entry = view
+                state.partial = True
+        print(f"[DEBUG] Compacted chat history {filename} to {len(history)} entries")
+    except Exception as e:
+        print(f"[DEBUG] Error compacting chat history: {e}")
+
+def _live_entries(records):
+    history = []
+    for record in records:
+        if record.get("op") == "clear":
+            history = []
+        elif record.get("op") == "add":
+            history.append(record["entry"])
+    return history
+
+def save_chat_history(history, filename=HISTORY_PATH):
+    """Persist chat history, appending only the entries added since the last save or load."""
+    try:
+        with _path_lock(filename):
+            state = _state(filename)
+            count = state.count
+            if count is not None and len(history) >= count and (
+                    count == 0 or list(history[count - 1]) == state.last_entry):
+                new_entries = history[count:]
+                if new_entries:
+                    _append_records(filename, [_record("add", entry) for entry in new_entries], state)
+                    state.count = len(history)
+                    state.last_entry = list(history[-1])
+            elif count is not None and not history:
+                # Cleared: an O(1) marker instead of a rewrite
+                _append_records(filename, [_record("clear")], state, force_sync=True)
+                state.dead += count + 1  # An undercount after a tail load; compaction just runs later
+                state.count = 0
+                state.last_entry = None
+                state.partial = False
+            elif state.partial:
+                # Caller diverged from the tail it loaded: keep the older entries and rewrite the rest
+                older = _live_entries(_read_records(filename))
+                prefix = older[:max(0, len(older) - count)]
+                _write_snapshot(filename, prefix + list(history), state)
+                state.count = len(history)  # Still the caller's view of the log
+                state.partial = bool(prefix)
+            else:
+                # Unknown or rewritten history: replace the log
+                _write_snapshot(filename, history, state)
+            compact = state.dead >= COMPACT_MIN_RECORDS and state.dead > state.count
+        if compact:
+            compact_chat_history(filename)
         print(f"[DEBUG] Saved chat history to {filename}")
     except Exception as e:
         print(f"[DEBUG] Error saving chat history: {e}")
 
-def load_chat_history(filename="chat_history.json"):
-    """Load chat history from a JSON file."""
+def load_chat_history(filename=HISTORY_PATH, last_n=None):
+    """Load chat history from the JSONL log; with last_n, only the tail of the file is read."""
     try:
-        if os.path.exists(filename):
-            with open(filename, "r") as f:
-                history = json.load(f)
-            print(f"[DEBUG] Loaded chat history from {filename}")
+        migrate_legacy(filename)
+        if not os.path.exists(filename):
+            return []
+        with _path_lock(filename):
+            _truncate_torn_tail(filename)
+        if last_n is not None:
+            history, complete = _read_tail(last_n, filename)
+            with _path_lock(filename):
+                state = _state(filename)
+                state.count = len(history)
+                state.last_entry = list(history[-1]) if history else None
+                state.partial = not complete
             return history
-        return []
+        records = _read_records(filename)
+        history = _live_entries(records)
+        with _path_lock(filename):
+            state = _state(filename)
+            state.count = len(history)
+            state.last_entry = list(history[-1]) if history else None
+            state.partial = False
+            state.dead = len(records) - len(history)
+        print(f"[DEBUG] Loaded chat history from {filename}")
+        return history
     except Exception as e:
         print(f"[DEBUG] Error loading chat history: {e}")
         return []
 
-def clear_chat_history(filename="chat_history.json"):
-    """Clear chat history by deleting the JSON file."""
+def tail_chat_history(n, filename=HISTORY_PATH):
+    """Return the last n live entries, reading the log backwards in blocks."""
+    return _read_tail(n, filename)[0]
+
+def _read_tail(n, filename):
+    """(last n live entries, whether they are all the live entries in the log)."""
+    entries = []
+    with open(filename, "rb") as f:
+        position = f.seek(0, os.SEEK_END)
+        remainder = b""
+        while position > 0:
+            size = min(TAIL_BLOCK_SIZE, position)
+            position -= size
+            f.seek(position)
+            lines = (f.read(size) + remainder).split(b"\n")
+            remainder = lines.pop(0) if position > 0 else b""  # Possibly partial first line
+            for line in reversed(lines):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if record.get("op") == "clear":
+                    return entries[::-1], True
+                if record.get("op") == "add":
+                    if len(entries) == n:
+                        return entries[::-1], False  # A live entry precedes the tail
+                    entries.append(record["entry"])
+    return entries[::-1], True
+
+def clear_chat_history(filename=HISTORY_PATH):
+    """Clear chat history by deleting the log file."""
     try:
-        if os.path.exists(filename):
-            os.remove(filename)
-            print(f"[DEBUG] Cleared chat history: {filename}")
+        with _path_lock(filename):
+            if os.path.exists(filename):
+                os.remove(filename)
+                print(f"[DEBUG] Cleared chat history: {filename}")
+            state = _state(filename)
+            state.count = 0
+            state.last_entry = None
+            state.partial = False
+            state.dead = 0
     except Exception as e:
-        print(f"[DEBUG] Error clearing chat history: {e}")
\ No newline at end of file
+        print(f"[DEBUG] Error clearing chat history: {e}")
+
+@atexit.register
+def _sync_on_exit():
+    """Flush the last unsynced batch of every log to disk."""
+    for path, state in _logs.items():
+        if state.unsynced and os.path.exists(path):
+            try:
+                with open(path, "a") as f:
+                    os.fsync(f.fileno())
+            except OSError:
+                pass
@@ -0,0 +1,20 @@
+from functools import lru_cache
+
+# Chat bubble markup lives outside app.py: Streamlit re-executes the script in a fresh
+# __main__ module on every rerun, which would start a cache defined there empty each time
+
+# CSS class of the chat bubble for each speaker (anything else is a plain assistant message)
+MESSAGE_CLASSES = {
+    "You": "user-message",
+    "Assistant (after web search)": "assistant-web-message",
+    "Assistant (Study Plan)": "assistant-plan-message",
+    "Assistant (Quiz)": "assistant-quiz-message",
+}
+
+@lru_cache(maxsize=4096)
+def message_html(speaker, message):
+    """HTML fragment for one chat message (cached, so reruns do not rebuild unchanged messages)."""
+    if speaker == "Reminder":
+        return f'<div class="chat-message assistant-message">Reminder: {message}</div>'
+    css_class = MESSAGE_CLASSES.get(speaker, "assistant-message")
+    return f'<div class="chat-message {css_class}">{message}</div>'
@@ -0,0 +1,71 @@
+# Maximum input tokens per model. Seq2seq encoders only hold the prompt; causal models
+# share their window between the prompt and the max_new_tokens they generate.
+MODEL_CONTEXT_LIMITS = {"t5-small": 512, "gpt2": 1024, "facebook/bart-large": 1024}
+SEQ2SEQ_MODELS = {"t5-small", "facebook/bart-large"}
+SAFETY_MARGIN = 8  # Tokens reserved for special tokens and tokenizer boundary effects
+CHARS_PER_TOKEN = 4  # Typical English text; used to estimate the size of chunks that are never tokenized
+MAX_CHARS_PER_TOKEN = 8  # Chunks are cut to remaining * this many chars before tokenizing
+
+def count_tokens(tokenizer, text):
+    """Number of tokens `text` occupies for this tokenizer (without special tokens)."""
+    return len(tokenizer(text, add_special_tokens=False)["input_ids"])
+
+def context_budget(model_name, tokenizer, prompt_tokens, max_new_tokens):
+    """Tokens left for retrieved context once the prompt template and generation are accounted for."""
+    limit = MODEL_CONTEXT_LIMITS.get(model_name) or min(getattr(tokenizer, "model_max_length", 1024), 1024)
+    budget = limit - prompt_tokens - SAFETY_MARGIN
+    if model_name not in SEQ2SEQ_MODELS:
+        budget -= max_new_tokens
+    return max(0, budget)
+
+def pack_context(chunks, tokenizer, budget):
+    """Fill `budget` tokens with the highest-scoring chunks.
+
+    `chunks` is a list of (text, score). Chunks are taken best-first; the first chunk that
+    does not fit is cut at the token boundary to use the remaining space, and the rest are
+    dropped. Returns (context_text, stats) where stats reports tokens used and dropped.
+
+    Only the text that can still fit is tokenized; tokens dropped beyond that are estimated
+    from the character count.
+    """
+    ranked = sorted((c for c in chunks if c[0]), key=lambda c: c[1], reverse=True)
+    packed = []
+    used = dropped = 0
+    chunks_used = 0
+    for text, _ in ranked:
+        remaining = budget - used
+        if remaining <= 0:
+            dropped += len(text) // CHARS_PER_TOKEN
+            continue
+        limit = remaining * MAX_CHARS_PER_TOKEN
+        head = text[:limit]
+        ids = tokenizer(head, add_special_tokens=False)["input_ids"]
+        if len(ids) <= remaining:
+            packed.append(head)
+            used += len(ids)
+        else:
+            packed.append(tokenizer.decode(ids[:remaining], skip_special_tokens=True))
+            used += remaining
+            dropped += len(ids) - remaining
+        dropped += len(text[limit:]) // CHARS_PER_TOKEN
+        chunks_used += 1
+    stats = {
+        "budget": budget,
+        "tokens_used": used,
+        "tokens_dropped": dropped,
+        "chunks_used": chunks_used,
+        "chunks_dropped": len(ranked) - chunks_used
+    }
+    return " ".join(packed), stats
+
+def build_packed_prompt(build_prompt, chunks, tokenizer, model_name, max_new_tokens):
+    """Build a prompt whose context is packed to fit the model's window.
+
+    `build_prompt(context)` renders the prompt template; its cost with an empty context
+    is subtracted from the model limit before packing.
+    """
+    prompt_tokens = count_tokens(tokenizer, build_prompt(""))
+    budget = context_budget(model_name, tokenizer, prompt_tokens, max_new_tokens)
+    context, stats = pack_context(chunks, tokenizer, budget)
+    print(f"[DEBUG] Context packing for {model_name}: {stats}")
+    return build_prompt(context), stats
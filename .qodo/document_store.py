@@ -0,0 +1,123 @@
+import os
+import mmap
+import pickle
+import operator
+from array import array
+
+# On-disk layout: <path>.bin holds every document as contiguous UTF-8, and
+# <path>.idx holds len(documents) + 1 uint64 byte offsets into the blob.
+BLOB_SUFFIX = ".bin"
+INDEX_SUFFIX = ".idx"
+
+def _map_file(path):
+    """Memory-map a file read-only; empty files map to an empty bytes object."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+class DocumentStore:
+    """Read-only, memory-mapped document list.
+
+    Opening is O(1) and only the pages of documents actually read become resident, so
+    several processes serving the same index share one copy through the OS page cache.
+    """
+
+    def __init__(self, path="data/documents"):
+        self.path = path
+        self._blob = _map_file(path + BLOB_SUFFIX)
+        self._index = _map_file(path + INDEX_SUFFIX)
+        self._offsets = memoryview(self._index).cast("Q") if len(self._index) else memoryview(array("Q", [0]))
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, idx):
+        return self.get(idx)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.get(i)
+
+    def get(self, idx, max_chars=None):
+        """Return document `idx`, decoding at most `max_chars` characters when given."""
+        idx = operator.index(idx)
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError("document index out of range")
+        start, end = self._offsets[idx], self._offsets[idx + 1]
+        if max_chars is not None:
+            # A UTF-8 character is at most 4 bytes, so this bounds the bytes we touch
+            end = min(end, start + max_chars * 4)
+            return bytes(self._blob[start:end]).decode("utf-8", errors="ignore")[:max_chars]
+        return bytes(self._blob[start:end]).decode("utf-8")
+
+    def close(self):
+        """Release the memory maps."""
+        self._offsets.release()
+        for m in (self._blob, self._index):
+            if isinstance(m, mmap.mmap):
+                m.close()
+
+def write_documents(documents, path="data/documents"):
+    """Write a complete document store, replacing any existing one atomically."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    offsets = array("Q", [0])
+    with open(path + BLOB_SUFFIX + ".tmp", "wb") as blob:
+        for doc in documents:
+            data = doc.encode("utf-8")
+            blob.write(data)
+            offsets.append(offsets[-1] + len(data))
+    with open(path + INDEX_SUFFIX + ".tmp", "wb") as index:
+        offsets.tofile(index)
+    os.replace(path + BLOB_SUFFIX + ".tmp", path + BLOB_SUFFIX)
+    os.replace(path + INDEX_SUFFIX + ".tmp", path + INDEX_SUFFIX)
+
+def append_documents(documents, path="data/documents"):
+    """Append documents to an existing store without rewriting it.
+
+    The blob is extended first and the offsets last, so a reader never sees an offset
+    that points past the data written so far.
+    """
+    if not store_exists(path):
+        write_documents(documents, path)
+        return
+    with open(path + INDEX_SUFFIX, "rb") as index:
+        index.seek(-8, os.SEEK_END)
+        last = array("Q")
+        last.fromfile(index, 1)
+    offsets = array("Q")
+    end = last[0]
+    with open(path + BLOB_SUFFIX, "ab") as blob:
+        blob.truncate(end)  # Drop bytes from any interrupted append
+        for doc in documents:
+            data = doc.encode("utf-8")
+            blob.write(data)
+            end += len(data)
+            offsets.append(end)
+        blob.flush()
+        os.fsync(blob.fileno())
+    with open(path + INDEX_SUFFIX, "ab") as index:
+        offsets.tofile(index)
+
+def store_exists(path="data/documents"):
+    """Check whether both files of a document store are present."""
+    return os.path.exists(path + BLOB_SUFFIX) and os.path.exists(path + INDEX_SUFFIX)
+
+def convert_pickle(docs_path="data/documents.pkl", path="data/documents"):
+    """One-shot conversion of the legacy documents.pkl list into a document store."""
+    with open(docs_path, "rb") as f:
+        documents = pickle.load(f)
+    write_documents(documents, path)
+    print(f"Converted {len(documents)} documents from {docs_path} to {path}{BLOB_SUFFIX}/{INDEX_SUFFIX}")
+    return len(documents)
+
+def open_document_store(path="data/documents", legacy_pickle="data/documents.pkl"):
+    """Open the document store, converting the legacy pickle on first use if needed."""
+    if not store_exists(path) and legacy_pickle and os.path.exists(legacy_pickle):
+        convert_pickle(legacy_pickle, path)
+    return DocumentStore(path)
+
+if __name__ == "__main__":
+    convert_pickle()
@@ -0,0 +1,86 @@
+import os
+import importlib.util
+from functools import lru_cache
+
+# CPU inference backend for the generation models:
+#   torch - full-precision PyTorch (default)
+#   int8  - PyTorch with dynamic int8 quantization of the linear layers
+#   onnx  - ONNX Runtime through optimum (falls back to int8 when optimum is not installed)
+BACKENDS = ("torch", "int8", "onnx")
+BACKEND = os.environ.get("INFERENCE_BACKEND", "torch").lower()
+SEQ2SEQ_MODELS = {"t5-small", "facebook/bart-large"}
+ONNX_DIR = os.environ.get("ONNX_MODEL_DIR", "data/onnx")  # Exported models, reused across processes and reloads
+
+def resolve_backend(backend=None):
+    """Return the backend to use, falling back when the requested one is unavailable."""
+    return _resolve((backend or BACKEND).lower())
+
+@lru_cache(maxsize=None)
+def _resolve(backend):
+    if backend not in BACKENDS:
+        print(f"Unknown inference backend {backend!r}, using torch")
+        return "torch"
+    if backend == "onnx" and not all(importlib.util.find_spec(m) for m in ("optimum", "onnxruntime")):
+        print("optimum[onnxruntime] is not installed, using the int8 backend instead of onnx")
+        return "int8"
+    return backend
+
+def _conv1d_to_linear(module):
+    """Replace GPT-2's Conv1D layers with equivalent nn.Linear layers so they can be quantized."""
+    import torch
+    from transformers.pytorch_utils import Conv1D
+    for name, child in module.named_children():
+        if isinstance(child, Conv1D):
+            in_features, out_features = child.weight.shape
+            linear = torch.nn.Linear(in_features, out_features)
+            linear.weight.data = child.weight.data.T.contiguous()
+            linear.bias.data = child.bias.data
+            setattr(module, name, linear)
+        else:
+            _conv1d_to_linear(child)
+    return module
+
+def quantize_model(model):
+    """Dynamic int8 quantization: weights stored as int8, activations quantized on the fly."""
+    import torch
+    model = _conv1d_to_linear(model)
+    return torch.ao.quantization.quantize_dynamic(model.eval(), {torch.nn.Linear}, dtype=torch.qint8)
+
+def onnx_model_dir(model_name):
+    """Directory holding the exported ONNX files for model_name."""
+    return os.path.join(ONNX_DIR, model_name.replace("/", "__"))
+
+def _load_onnx_model(model_name):
+    """Load the exported ONNX model, exporting it once (tens of seconds for bart-large) if missing."""
+    import shutil
+    import tempfile
+    from optimum.onnxruntime import ORTModelForCausalLM, ORTModelForSeq2SeqLM
+    model_class = ORTModelForSeq2SeqLM if model_name in SEQ2SEQ_MODELS else ORTModelForCausalLM
+    path = onnx_model_dir(model_name)
+    if not os.path.exists(os.path.join(path, "config.json")):
+        print(f"[DEBUG] Exporting {model_name} to ONNX in {path}")
+        os.makedirs(ONNX_DIR, exist_ok=True)
+        tmp_path = tempfile.mkdtemp(prefix=".export-", dir=ONNX_DIR)
+        try:
+            model_class.from_pretrained(model_name, export=True).save_pretrained(tmp_path)
+            try:
+                os.rename(tmp_path, path)  # Atomic; another process may have finished first
+            except OSError:
+                if not os.path.exists(os.path.join(path, "config.json")):
+                    raise
+        finally:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+    return model_class.from_pretrained(path)
+
+def load_model_and_tokenizer(model_name, backend=None):
+    """Load (model, tokenizer) for model_name on the given backend."""
+    from transformers import AutoTokenizer, AutoModelForCausalLM, AutoModelForSeq2SeqLM
+    backend = resolve_backend(backend)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    if backend == "onnx":
+        return _load_onnx_model(model_name), tokenizer
+    model_class = AutoModelForSeq2SeqLM if model_name in SEQ2SEQ_MODELS else AutoModelForCausalLM
+    model = model_class.from_pretrained(model_name).eval()
+    if backend == "int8":
+        model = quantize_model(model)
+    return model, tokenizer
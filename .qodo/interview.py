@@ -1,14 +1,60 @@
 import streamlit as st
-import quiz_generator
-from transformers import pipeline
+import startup
+with startup.timed("import quiz_generator", "import"):
+    import quiz_generator
+import question_bank
+import user_session
 import webbrowser
 import os
 import json
 import pandas as pd
-import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.figure import Figure
 import io
 import base64
 
+QUESTIONS_PER_PAGE = 10
+MAX_CHART_POINTS = 30  # Longer histories are averaged into this many bars
+
+def performance_series(records, max_points=MAX_CHART_POINTS):
+    """(labels, percentages) for the score chart, downsampled to at most max_points bars."""
+    df = pd.DataFrame(records)
+    df["timestamp"] = pd.to_datetime(df["timestamp"])
+    df["percentage"] = (df["score"] / df["total_questions"]) * 100
+    if len(df) > max_points:
+        # Average consecutive attempts into equal-sized buckets, labelled by their last attempt
+        df["bucket"] = np.arange(len(df)) * max_points // len(df)
+        df = df.groupby("bucket").agg(timestamp=("timestamp", "last"), percentage=("percentage", "mean"))
+    return df["timestamp"].astype(str).tolist(), df["percentage"].tolist()
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def performance_chart(user_id, company, role, version, max_points=MAX_CHART_POINTS):
+    """Base64 PNG of the past-scores chart; `version` keys the cache so it is only redrawn after a new result."""
+    records = quiz_generator.load_performance(company, role, user_id=user_id)
+    labels, percentages = performance_series(records, max_points)
+    fig = Figure(figsize=(6, 2))
+    ax = fig.subplots()
+    ax.bar(labels, percentages, color=["#f97316", "#7e22ce"] * len(labels))
+    ax.set_title("Past Scores (%)")
+    ax.tick_params(axis="x", labelrotation=45)
+    for label in ax.get_xticklabels():
+        label.set_horizontalalignment("right")
+    fig.tight_layout()
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png")
+    return base64.b64encode(buf.getvalue()).decode()
+
+@st.experimental_fragment(run_every=1)
+def generation_progress():
+    """Poll the background quiz job and rerun the page whenever new questions are ready."""
+    job = st.session_state.quiz_job
+    if job is None:
+        return
+    ready, total = job.progress()
+    st.progress(ready / total if total else 0.0, text=f"Generated {ready} of {total} questions...")
+    if job.done or ready != len(st.session_state.quiz):
+        st.rerun()
+
 def main():
     """Run the Streamlit mock interview interface."""
     st.set_page_config(page_title="Mock Interview", layout="wide")
@@ -59,12 +105,10 @@ def main():
     """, unsafe_allow_html=True)
 
     st.title("Mock Interview for Engineering Roles")
+    user_id = user_session.current_user_id()
     st.write("Select a company and role to start your mock interview.")
 
     # Initialize session state
-    if "generator" not in st.session_state:
-        st.session_state.generator = pipeline("text-generation", model="t5-small")
-        st.session_state.model_name = "t5-small"
     if "quiz" not in st.session_state:
         st.session_state.quiz = []
     if "current_page" not in st.session_state:
@@ -79,15 +123,13 @@ def main():
         st.session_state.company = "Meta"
     if "role" not in st.session_state:
         st.session_state.role = "Software Engineer"
+    if "quiz_job" not in st.session_state:
+        st.session_state.quiz_job = None
 
     # Company and role selection
-    companies = sorted([
-        "Amazon", "Apple", "Meta", "Google", "Microsoft", "Tesla", "Other"
-    ])
-    roles = [
-        "Software Engineer", "Data Engineer", "Systems Engineer", "Machine Learning Engineer",
-        "Embedded Systems Engineer", "Robotics Engineer", "Engineering Intern"
-    ]
+    # The offered pairs are the ones pre-generated in the question bank
+    companies = sorted(question_bank.COMPANIES + ["Other"])
+    roles = question_bank.ROLES
     col1, col2 = st.columns(2)
     with col1:
         company = st.selectbox("Select Company", companies, index=companies.index(st.session_state.company))
@@ -97,49 +139,54 @@ def main():
         company = st.text_input("Enter Custom Company Name", value=st.session_state.company)
 
     if st.button("Generate Interview Questions"):
-        with st.spinner(f"Fetching 50 unique {company} {role} interview questions..."):
-            st.session_state.company = company
-            st.session_state.role = role
-            st.session_state.quiz = quiz_generator.generate_quiz(
-                st.session_state.generator, st.session_state.model_name, company, role
-            )
-            st.session_state.current_page = 0
-            st.session_state.answers = {}
-            st.session_state.score = 0
-            st.session_state.quiz_completed = False
+        # Questions are generated a page at a time on a background thread; page 1 renders
+        # as soon as its questions are ready while the rest keep generating
+        if st.session_state.quiz_job is not None:
+            st.session_state.quiz_job.cancel()
+        st.session_state.company = company
+        st.session_state.role = role
+        st.session_state.quiz_job = quiz_generator.QuizGenerationJob(
+            company, role, num_questions=50, chunk_size=QUESTIONS_PER_PAGE
+        ).start()
+        st.session_state.quiz = []
+        st.session_state.current_page = 0
+        st.session_state.answers = {}
+        st.session_state.score = 0
+        st.session_state.quiz_completed = False
         st.rerun()
 
+    # Pick up questions the background job has finished since the last run
+    job = st.session_state.quiz_job
+    if job is not None:
+        st.session_state.quiz = job.snapshot()
+        if job.done:
+            st.session_state.quiz_job = None
+            if job.error is not None:
+                st.error(f"Error generating questions: {job.error}")
+        else:
+            if not st.session_state.quiz:
+                st.info(f"Fetching 50 unique {job.company} {job.role} interview questions...")
+            generation_progress()
+
     # Display performance history graph
-    performance_data = quiz_generator.load_performance()
-    filtered_data = [
-        p for p in performance_data
-        if p["company"] == st.session_state.company and p["role"] == st.session_state.role
-    ]
-    if filtered_data:
+    summary = quiz_generator.performance_summary(st.session_state.company, st.session_state.role, user_id=user_id)
+    if summary:
         st.subheader("Performance History")
-        df = pd.DataFrame(filtered_data)
-        df["timestamp"] = pd.to_datetime(df["timestamp"])
-        df["percentage"] = (df["score"] / df["total_questions"]) * 100
-        plt.figure(figsize=(6, 2))
-        plt.bar(df["timestamp"].astype(str), df["percentage"], color=["#f97316", "#7e22ce"] * len(df))
-        plt.title("Past Scores (%)")
-        plt.xticks(rotation=45, ha="right")
-        plt.tight_layout()
-        buf = io.BytesIO()
-        plt.savefig(buf, format="png")
-        buf.seek(0)
-        img_str = base64.b64encode(buf.getvalue()).decode()
+        st.write(f"Attempts: {summary['attempts']} | Average: {summary['average_percentage']:.2f}% | "
+                 f"Best: {summary['best_percentage']:.2f}%")
+        # The attempt count only changes when save_performance records a new result
+        img_str = performance_chart(user_id, st.session_state.company, st.session_state.role, summary["attempts"])
         st.image(f"data:image/png;base64,{img_str}")
-        plt.close()
 
     # Display quiz
     if st.session_state.quiz:
-        questions_per_page = 10
-        start_idx = st.session_state.current_page * questions_per_page
-        end_idx = min(start_idx + questions_per_page, len(st.session_state.quiz))
+        generating = st.session_state.quiz_job is not None
+        start_idx = st.session_state.current_page * QUESTIONS_PER_PAGE
+        end_idx = min(start_idx + QUESTIONS_PER_PAGE, len(st.session_state.quiz))
         current_questions = st.session_state.quiz[start_idx:end_idx]
+        total = st.session_state.quiz_job.total if generating else len(st.session_state.quiz)
 
-        st.subheader(f"Questions {start_idx + 1} - {end_idx} of {len(st.session_state.quiz)}")
+        st.subheader(f"Questions {start_idx + 1} - {end_idx} of {total}")
         for i, q_data in enumerate(current_questions, start=start_idx):
             with st.container():
                 st.markdown('<div class="question-container">', unsafe_allow_html=True)
@@ -168,15 +215,17 @@ def main():
                 if st.button("Next Page"):
                     st.session_state.current_page += 1
                     st.rerun()
+            elif generating:
+                st.caption("Next page is being generated...")
 
-        if st.button("Submit Answers"):
+        if st.button("Submit Answers", disabled=generating):
             for i in range(len(st.session_state.quiz)):
                 answer_data = st.session_state.answers.get(i, {})
                 if answer_data.get("selected") == answer_data.get("correct"):
                     st.session_state.score += 1
             quiz_generator.save_performance(
                 st.session_state.company, st.session_state.role,
-                st.session_state.score, len(st.session_state.quiz)
+                st.session_state.score, len(st.session_state.quiz), user_id=user_id
             )
             st.session_state.quiz_completed = True
             st.rerun()
@@ -193,6 +242,9 @@ def main():
             st.markdown("---")
 
         if st.button("Restart Interview"):
+            if st.session_state.quiz_job is not None:
+                st.session_state.quiz_job.cancel()
+            st.session_state.quiz_job = None
             st.session_state.quiz = []
             st.session_state.current_page = 0
             st.session_state.answers = {}
@@ -200,5 +252,8 @@ def main():
             st.session_state.quiz_completed = False
             st.rerun()
 
+    # Load models in the background now that the first frame is drawn
+    startup.prewarm([quiz_generator.load_models, quiz_generator.load_faiss_index])
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,243 @@
+import os
+import time
+import threading
+
+EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
+# Memory ceiling for all loaded resources; generation models are evicted (LRU) to stay under it. 0 disables eviction
+MEMORY_LIMIT_MB = int(os.environ.get("MODEL_MEMORY_LIMIT_MB", "2048"))
+# Approximate fp32 weight sizes, used to make room before a model's first load (when nothing was measured yet)
+GENERATOR_SIZE_MB = {"gpt2": 475, "t5-small": 231, "facebook/bart-large": 1550}
+BACKEND_SIZE_FACTOR = {"torch": 1.0, "int8": 0.5, "onnx": 1.0}  # int8 keeps embeddings in fp32
+
+class _Entry:
+    """A loaded resource plus its bookkeeping."""
+
+    def __init__(self):
+        self.value = None
+        self.loaded = False
+        self.owners = set()
+        self.size_bytes = 0
+        self.last_size_bytes = 0  # Size at the last load, used to make room before reloading
+        self.load_seconds = 0.0
+        self.evictable = False
+        self.last_used = 0.0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+def _tensor_bytes(values):
+    """Bytes of distinct tensors among state_dict values.
+
+    Dynamically quantized layers keep their int8 weights in packed params that
+    parameters() does not list; the state dict exposes them as (weight, bias) tuples.
+    Tied weights appear under several keys and are counted once.
+    """
+    seen = set()
+    total = 0
+    stack = list(values)
+    while stack:
+        value = stack.pop()
+        if isinstance(value, (tuple, list)):
+            stack.extend(value)
+        elif hasattr(value, "element_size") and hasattr(value, "data_ptr"):
+            key = (value.data_ptr(), value.numel())
+            if key not in seen:
+                seen.add(key)
+                total += value.numel() * value.element_size()
+    return total
+
+def _faiss_bytes(index):
+    """Stored codes (plus the HNSW graph) of a FAISS index, without serializing a copy of it."""
+    import faiss
+    index = faiss.downcast_index(index)
+    hnsw = getattr(index, "hnsw", None)
+    if hnsw is not None:
+        return _faiss_bytes(index.storage) + hnsw.neighbors.size() * 4 + hnsw.offsets.size() * 8
+    try:
+        return int(index.sa_code_size()) * int(index.ntotal)
+    except RuntimeError:
+        return int(index.ntotal) * int(index.d) * 4  # Flat float32 vectors
+
+def estimate_size(obj):
+    """Best-effort resident size in bytes of a model, pipeline, index or document store."""
+    if obj is None:
+        return 0
+    if isinstance(obj, (tuple, list)):
+        return sum(estimate_size(o) for o in obj)
+    model = getattr(obj, "model", obj)  # transformers pipelines wrap the model
+    if hasattr(model, "state_dict") and hasattr(model, "parameters"):
+        # Non-persistent buffers (e.g. attention masks) are resident but absent from the state dict
+        return _tensor_bytes(list(model.state_dict().values()) + list(model.buffers()))
+    save_dir = getattr(model, "model_save_dir", None)  # ONNX Runtime models: the mapped .onnx files
+    if save_dir and os.path.isdir(save_dir):
+        return sum(entry.stat().st_size for entry in os.scandir(save_dir)
+                   if entry.is_file() and ".onnx" in entry.name)
+    if hasattr(obj, "ntotal") and hasattr(obj, "d"):  # FAISS index
+        return _faiss_bytes(obj)
+    path = getattr(obj, "path", None)  # DocumentStore: mapped files, shared via the page cache
+    if path and os.path.exists(path + ".bin"):
+        return os.path.getsize(path + ".bin") + os.path.getsize(path + ".idx")
+    return 0
+
+class ResourceRegistry:
+    """Process-wide registry of lazily-initialised shared resources.
+
+    Every module and session asks the registry for a resource by key; the first caller
+    loads it, later callers share the same object. Callers pass their module name as the
+    owner, so the report shows which modules use each resource. Resources stay loaded for
+    the life of the process; there is no per-session reference counting.
+
+    Resources acquired with evictable=True (the generation models) are additionally kept
+    under `max_bytes`: when loading one would exceed the ceiling, the least recently used
+    evictable resources are unloaded and transparently reloaded on their next acquire.
+    """
+
+    def __init__(self, max_bytes=MEMORY_LIMIT_MB * 2**20):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self.max_bytes = max_bytes
+
+    def _entry(self, key):
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = _Entry()
+            return self._entries[key]
+
+    def acquire(self, key, loader, owner="default", evictable=False, size_hint=0):
+        """Return the resource for `key`, loading it with `loader()` on first use.
+
+        `size_hint` is the expected size in bytes, used to make room before the first load;
+        reloads after an eviction use the size measured at the previous load instead.
+        """
+        entry = self._entry(key)
+        with entry.lock:
+            entry.evictable = evictable
+            entry.last_used = time.monotonic()
+            if not entry.loaded:
+                if evictable:
+                    self._make_room(entry.last_size_bytes or size_hint, keep=key)
+                start = time.perf_counter()
+                entry.value = loader()  # Failures propagate and are retried on the next call
+                entry.load_seconds = time.perf_counter() - start
+                entry.size_bytes = entry.last_size_bytes = estimate_size(entry.value)
+                entry.loaded = True
+                print(f"[DEBUG] Loaded {key} in {entry.load_seconds:.1f}s ({entry.size_bytes / 2**20:.1f} MB)")
+                if evictable:
+                    self._make_room(0, keep=key)
+            entry.owners.add(owner)
+            return entry.value
+
+    def _make_room(self, incoming_bytes, keep):
+        """Evict least recently used evictable resources until `incoming_bytes` more fit under the ceiling."""
+        if not self.max_bytes:
+            return
+        with self._lock:
+            candidates = sorted(
+                ((k, e) for k, e in self._entries.items() if k != keep and e.evictable and e.loaded),
+                key=lambda item: item[1].last_used
+            )
+        for key, entry in candidates:
+            if self.total_bytes() + incoming_bytes <= self.max_bytes:
+                return
+            if not entry.lock.acquire(blocking=False):
+                continue  # Being loaded or handed out right now; try the next one
+            try:
+                if entry.loaded:
+                    self._unload(entry)
+                    entry.evictions += 1
+                    print(f"[DEBUG] Evicted {key} to stay under {self.max_bytes / 2**20:.0f} MB")
+            finally:
+                entry.lock.release()
+
+    @staticmethod
+    def _unload(entry):
+        # Callers still holding the object keep it alive until they finish with it
+        entry.value = None
+        entry.loaded = False
+        entry.size_bytes = 0
+        entry.owners.clear()
+
+    def report(self):
+        """Per-resource owning modules, memory use and load time."""
+        with self._lock:
+            items = list(self._entries.items())
+        return [
+            {
+                "resource": key,
+                "owners": sorted(entry.owners),
+                "size_mb": round(entry.size_bytes / 2**20, 1),
+                "load_s": round(entry.load_seconds, 2),
+                "evictable": entry.evictable,
+                "evictions": entry.evictions,
+            }
+            for key, entry in items if entry.loaded
+        ]
+
+    def memory_stats(self):
+        """Current memory use against the ceiling, and eviction counts per resource."""
+        with self._lock:
+            items = list(self._entries.items())
+        return {
+            "used_mb": round(sum(e.size_bytes for _, e in items if e.loaded) / 2**20, 1),
+            "evictable_mb": round(sum(e.size_bytes for _, e in items if e.loaded and e.evictable) / 2**20, 1),
+            "limit_mb": round(self.max_bytes / 2**20, 1) if self.max_bytes else None,
+            "evictions": sum(e.evictions for _, e in items),
+            "evicted": {key: e.evictions for key, e in items if e.evictions},
+        }
+
+    def total_bytes(self):
+        """Total estimated memory held by loaded resources."""
+        with self._lock:
+            return sum(entry.size_bytes for entry in self._entries.values() if entry.loaded)
+
+registry = ResourceRegistry()
+
+def _load_generator(model_name, backend=None):
+    """Build the text generation pipeline for model_name on the configured inference backend."""
+    from transformers import pipeline
+    from inference_backend import load_model_and_tokenizer
+    if model_name not in ("t5-small", "facebook/bart-large"):
+        model_name = "gpt2"  # Default to gpt2
+    model, tokenizer = load_model_and_tokenizer(model_name, backend)
+    if model_name == "t5-small":
+        return pipeline("text2text-generation", model=model, tokenizer=tokenizer, device=-1)
+    # gpt2 (the default) and facebook/bart-large
+    return pipeline("text-generation", model=model, tokenizer=tokenizer, device=-1)
+
+def _load_embedding_model(name):
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(name)
+
+def _load_faiss_index(index_path, docs_path):
+    import faiss
+    from document_store import open_document_store
+    from vector_index import configure_search
+    index = configure_search(faiss.read_index(index_path))
+    documents = open_document_store(docs_path)
+    return index, documents
+
+def expected_generator_bytes(model_name, backend):
+    """Estimated resident size of a generation model before it has ever been loaded."""
+    if backend == "onnx":
+        from inference_backend import onnx_model_dir
+        path = onnx_model_dir(model_name)
+        if os.path.isdir(path):  # Already exported: the .onnx files are what gets mapped
+            return sum(entry.stat().st_size for entry in os.scandir(path)
+                       if entry.is_file() and ".onnx" in entry.name)
+    size_mb = GENERATOR_SIZE_MB.get(model_name, GENERATOR_SIZE_MB["gpt2"])  # Unknown models load gpt2
+    return int(size_mb * BACKEND_SIZE_FACTOR.get(backend, 1.0) * 2**20)
+
+def get_generator(model_name, owner="default", backend=None):
+    """Shared text generation pipeline for model_name."""
+    from inference_backend import resolve_backend
+    backend = resolve_backend(backend)
+    key = f"generator:{model_name}" if backend == "torch" else f"generator:{model_name}@{backend}"
+    return registry.acquire(key, lambda: _load_generator(model_name, backend), owner, evictable=True,
+                            size_hint=expected_generator_bytes(model_name, backend))
+
+def get_embedding_model(name=EMBEDDING_MODEL_NAME, owner="default"):
+    """Shared sentence embedding model."""
+    return registry.acquire(f"embedding:{name}", lambda: _load_embedding_model(name), owner)
+
+def get_faiss_index(index_path="data/faiss_index", docs_path="data/documents", owner="default"):
+    """Shared (FAISS index, document store) pair."""
+    return registry.acquire(f"faiss:{index_path}", lambda: _load_faiss_index(index_path, docs_path), owner)
@@ -0,0 +1,128 @@
+import os
+import json
+import sqlite3
+import user_session
+from sqlite_local import ThreadLocalConnection
+
+# Interview scores, one row per attempt, plus running per-company/role summaries. Each user
+# has their own database under user_session's sharded directories; the default user keeps STORE_PATH
+STORE_PATH = os.environ.get("PERFORMANCE_DB_PATH", "data/performance.db")
+LEGACY_PATH = "data/performance_history.json"
+
+class PerformanceStore:
+    """SQLite store of interview results.
+
+    WAL mode lets concurrent interviews write without losing rows, history queries use
+    the (company, role, timestamp) index, and the summary table is updated in the same
+    transaction as each insert so aggregates never need a scan.
+    """
+
+    def __init__(self, path=STORE_PATH, legacy_path=LEGACY_PATH):
+        self.path = path
+        self._connect = ThreadLocalConnection(path, row_factory=sqlite3.Row)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "id INTEGER PRIMARY KEY, company TEXT NOT NULL, role TEXT NOT NULL, "
+                "score INTEGER NOT NULL, total_questions INTEGER NOT NULL, timestamp TEXT NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_results_pair ON results (company, role, timestamp)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS summaries ("
+                "company TEXT NOT NULL, role TEXT NOT NULL, attempts INTEGER NOT NULL, "
+                "total_score INTEGER NOT NULL, total_questions INTEGER NOT NULL, best_percentage REAL NOT NULL, "
+                "last_timestamp TEXT NOT NULL, PRIMARY KEY (company, role))"
+            )
+        self._migrate(legacy_path)
+
+    def _migrate(self, legacy_path):
+        """Import an existing performance_history.json once; the old file is kept as .bak."""
+        if not legacy_path or not os.path.exists(legacy_path):
+            return
+        try:
+            with open(legacy_path, "r") as f:
+                history = json.load(f)
+            self.add_many(history)
+            os.replace(legacy_path, f"{legacy_path}.bak")
+            print(f"Migrated {len(history)} performance records from {legacy_path}")
+        except Exception as e:
+            print(f"Error migrating performance history: {e}")
+
+    @staticmethod
+    def _insert(conn, record):
+        company, role = record["company"], record["role"]
+        score, total = int(record["score"]), int(record["total_questions"])
+        percentage = score / total * 100 if total else 0.0
+        conn.execute(
+            "INSERT INTO results (company, role, score, total_questions, timestamp) VALUES (?, ?, ?, ?, ?)",
+            (company, role, score, total, record["timestamp"])
+        )
+        conn.execute(
+            "INSERT INTO summaries (company, role, attempts, total_score, total_questions, best_percentage, last_timestamp) "
+            "VALUES (?, ?, 1, ?, ?, ?, ?) "
+            "ON CONFLICT (company, role) DO UPDATE SET "
+            "attempts = attempts + 1, total_score = total_score + excluded.total_score, "
+            "total_questions = total_questions + excluded.total_questions, "
+            "best_percentage = MAX(best_percentage, excluded.best_percentage), "
+            "last_timestamp = MAX(last_timestamp, excluded.last_timestamp)",
+            (company, role, score, total, percentage, record["timestamp"])
+        )
+
+    def add(self, record):
+        """Insert one result dict (company, role, score, total_questions, timestamp)."""
+        self.add_many([record])
+
+    def add_many(self, records):
+        conn = self._connect()
+        with conn:
+            for record in records:
+                self._insert(conn, record)
+
+    def history(self, company=None, role=None, limit=None):
+        """Results oldest first, optionally filtered by company/role and limited to the most recent."""
+        clauses, params = [], []
+        if company is not None:
+            clauses.append("company = ?")
+            params.append(company)
+        if role is not None:
+            clauses.append("role = ?")
+            params.append(role)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        query = f"SELECT company, role, score, total_questions, timestamp FROM results {where} ORDER BY timestamp DESC, id DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        rows = self._connect().execute(query, params).fetchall()
+        return [dict(row) for row in reversed(rows)]
+
+    def summary(self, company, role):
+        """Pre-aggregated attempts, average and best percentage for a pair, or None."""
+        row = self._connect().execute(
+            "SELECT * FROM summaries WHERE company = ? AND role = ?", (company, role)
+        ).fetchone()
+        return self._summary_dict(row) if row else None
+
+    def summaries(self):
+        """Summaries for every company/role pair."""
+        rows = self._connect().execute("SELECT * FROM summaries ORDER BY company, role").fetchall()
+        return [self._summary_dict(row) for row in rows]
+
+    @staticmethod
+    def _summary_dict(row):
+        summary = dict(row)
+        total = summary["total_questions"]
+        summary["average_percentage"] = round(summary["total_score"] / total * 100, 2) if total else 0.0
+        return summary
+
+_stores = user_session.LRUCache()
+
+def get_store(user_id=user_session.DEFAULT_USER):
+    """Return the performance store for a user (recently used stores stay open)."""
+    user_id = user_session.normalize_user_id(user_id)
+
+    def open_store():
+        path = user_session.user_path(user_id, "performance.db", legacy_path=STORE_PATH)
+        return PerformanceStore(path, legacy_path=LEGACY_PATH if user_id == user_session.DEFAULT_USER else None)
+
+    return _stores.get_or_create(user_id, open_store)
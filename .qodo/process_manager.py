@@ -0,0 +1,125 @@
+import os
+import sys
+import time
+import atexit
+import threading
+import subprocess
+import webbrowser
+import urllib.request
+
+# The mock interview runs as its own Streamlit server next to the chat app
+INTERVIEW_PORT = int(os.environ.get("INTERVIEW_PORT", "8502"))
+HEALTH_PATH = "/_stcore/health"
+STARTUP_TIMEOUT = 60  # seconds to wait for a new server to report healthy
+LOG_DIR = "data/logs"
+
+class ManagedProcess:
+    """A background server process that is started once, health-checked, reused and shut down at exit."""
+
+    def __init__(self, name, args, port, health_path=HEALTH_PATH):
+        self.name = name
+        self.args = args
+        self.port = port
+        self.health_path = health_path
+        self._process = None
+        self._lock = threading.Lock()
+        atexit.register(self.stop)
+
+    @property
+    def url(self):
+        return f"http://localhost:{self.port}"
+
+    def is_healthy(self, timeout=1.0):
+        """True if a server answers the health check on our port (ours or one started earlier)."""
+        try:
+            with urllib.request.urlopen(f"{self.url}{self.health_path}", timeout=timeout) as response:
+                return response.status == 200
+        except Exception:
+            return False
+
+    def is_running(self):
+        """True if the process we started is still alive."""
+        return self._process is not None and self._process.poll() is None
+
+    def ensure_running(self):
+        """Start the server unless it is already running or answering on the port; returns immediately."""
+        with self._lock:
+            if self.is_running() or self.is_healthy():
+                return False
+            os.makedirs(LOG_DIR, exist_ok=True)
+            log = open(os.path.join(LOG_DIR, f"{self.name}.log"), "ab")
+            try:
+                self._process = subprocess.Popen(
+                    self.args, stdout=log, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL
+                )
+            finally:
+                log.close()  # The child keeps its own handle
+            print(f"[DEBUG] Started {self.name} (pid {self._process.pid}) on port {self.port}")
+            return True
+
+    def wait_until_healthy(self, timeout=STARTUP_TIMEOUT, interval=0.5):
+        """Poll the health check until it passes, the process dies or the timeout expires."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.is_healthy():
+                return True
+            if self._process is not None and self._process.poll() is not None:
+                print(f"[DEBUG] {self.name} exited with code {self._process.returncode}")
+                return False
+            time.sleep(interval)
+        return False
+
+    def open_when_ready(self, path=""):
+        """Open the server in a browser once it is healthy, without blocking the caller."""
+        def run():
+            if self.wait_until_healthy():
+                webbrowser.open(f"{self.url}{path}")
+            else:
+                print(f"[DEBUG] {self.name} did not become healthy on port {self.port}")
+        thread = threading.Thread(target=run, name=f"open-{self.name}", daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self, timeout=10):
+        """Terminate the process we started (SIGTERM, then SIGKILL after `timeout`)."""
+        with self._lock:
+            process, self._process = self._process, None
+        if process is None or process.poll() is not None:
+            return
+        process.terminate()
+        try:
+            process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+        print(f"[DEBUG] Stopped {self.name} (pid {process.pid})")
+
+    def status(self, check_health=False):
+        """pid and liveness of the managed server; the HTTP health check only runs with check_health=True."""
+        running = self.is_running()
+        status = {
+            "name": self.name,
+            "pid": self._process.pid if running else None,
+            "running": running,
+            "url": self.url,
+        }
+        if check_health:
+            status["healthy"] = self.is_healthy(timeout=0.2)
+        return status
+
+_interview = None
+_interview_lock = threading.Lock()
+
+def get_interview_server(port=INTERVIEW_PORT):
+    """Process-wide manager for the mock interview Streamlit server."""
+    global _interview
+    with _interview_lock:
+        if _interview is None:
+            script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "interview.py")
+            _interview = ManagedProcess(
+                "interview",
+                [sys.executable, "-m", "streamlit", "run", script,
+                 "--server.port", str(port), "--server.headless", "true"],
+                port
+            )
+        return _interview
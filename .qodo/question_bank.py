@@ -0,0 +1,138 @@
+import os
+import json
+import time
+import random
+import argparse
+import threading
+from sqlite_local import ThreadLocalConnection
+
+# Pre-generated multiple-choice questions for the company/role pairs offered by interview.py
+BANK_PATH = os.environ.get("QUESTION_BANK_PATH", "data/question_bank.db")
+QUESTIONS_PER_PAIR = int(os.environ.get("QUESTION_BANK_SIZE", "100"))
+
+COMPANIES = ["Amazon", "Apple", "Meta", "Google", "Microsoft", "Tesla"]
+ROLES = [
+    "Software Engineer", "Data Engineer", "Systems Engineer", "Machine Learning Engineer",
+    "Embedded Systems Engineer", "Robotics Engineer", "Engineering Intern"
+]
+
+class QuestionBank:
+    """SQLite store of quiz entries indexed by (company, role).
+
+    Draws prefer the least-served questions, so consecutive interviews for the same pair
+    do not repeat questions until the bank has been cycled through. Entries are unique per
+    source question (the fetched question an MCQ was generated from), which is what
+    top-ups and live generation compare candidates against.
+    """
+
+    def __init__(self, path=BANK_PATH):
+        self.path = path
+        self._connect = ThreadLocalConnection(path)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS questions ("
+                "id INTEGER PRIMARY KEY, company TEXT NOT NULL, role TEXT NOT NULL, source TEXT NOT NULL, "
+                "question TEXT NOT NULL, entry TEXT NOT NULL, created REAL NOT NULL, "
+                "served_count INTEGER NOT NULL DEFAULT 0, UNIQUE (company, role, source))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_questions_pair ON questions (company, role, served_count)")
+
+    def add(self, company, role, quiz_entries, served=False):
+        """Insert quiz entries, skipping source questions already banked; returns the number added."""
+        now = time.time()
+        rows = [
+            (company, role, entry.get("source", entry["question"]), entry["question"], json.dumps(entry), now, int(served))
+            for entry in quiz_entries if entry.get("correct_answer") not in (None, "N/A")
+        ]
+        conn = self._connect()
+        with conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO questions (company, role, source, question, entry, created, served_count) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            return conn.total_changes - before
+
+    def draw(self, company, role, num_questions):
+        """Randomized sample of up to num_questions distinct entries, least served first."""
+        conn = self._connect()
+        with conn:
+            rows = conn.execute(
+                "SELECT id, entry FROM questions WHERE company = ? AND role = ? "
+                "ORDER BY served_count, RANDOM() LIMIT ?", (company, role, num_questions)
+            ).fetchall()
+            conn.executemany("UPDATE questions SET served_count = served_count + 1 WHERE id = ?",
+                             [(row[0],) for row in rows])
+        entries = [json.loads(entry) for _, entry in rows]
+        random.shuffle(entries)
+        return entries
+
+    def questions(self, company, role):
+        """Set of source questions already banked for the pair."""
+        rows = self._connect().execute(
+            "SELECT source FROM questions WHERE company = ? AND role = ?", (company, role)
+        ).fetchall()
+        return {row[0] for row in rows}
+
+    def count(self, company, role):
+        """Number of banked entries for the pair."""
+        return self._connect().execute(
+            "SELECT COUNT(*) FROM questions WHERE company = ? AND role = ?", (company, role)
+        ).fetchone()[0]
+
+    def stats(self):
+        """Banked entry count per (company, role)."""
+        rows = self._connect().execute(
+            "SELECT company, role, COUNT(*) FROM questions GROUP BY company, role ORDER BY company, role"
+        ).fetchall()
+        return [{"company": c, "role": r, "questions": n} for c, r, n in rows]
+
+_bank = None
+_bank_lock = threading.Lock()
+
+def get_bank():
+    """Return the process-wide question bank."""
+    global _bank
+    with _bank_lock:
+        if _bank is None:
+            _bank = QuestionBank()
+        return _bank
+
+def top_up(company, role, target=QUESTIONS_PER_PAIR, bank=None):
+    """Generate questions for a pair until the bank holds `target` of them; returns the number added."""
+    import quiz_generator
+    bank = bank or get_bank()
+    existing = bank.questions(company, role)
+    needed = target - len(existing)
+    if needed <= 0:
+        return 0
+    # Ask for enough candidates that new questions remain once banked ones are skipped
+    candidates = quiz_generator.quiz_questions(company, role, len(existing) + needed)
+    new_questions = [q for q in candidates if q not in existing][:needed]
+    added = 0
+    for chunk in quiz_generator.generate_quiz_iter(company, role, questions=new_questions):
+        added += bank.add(company, role, chunk)
+    print(f"Banked {added} new questions for {company} {role} ({len(existing) + added} total)")
+    return added
+
+def build_bank(companies=COMPANIES, roles=ROLES, target=QUESTIONS_PER_PAIR):
+    """Top up every company x role pair to `target` questions."""
+    bank = get_bank()
+    for company in companies:
+        for role in roles:
+            try:
+                top_up(company, role, target, bank)
+            except Exception as e:
+                print(f"Error building question bank for {company} {role}: {e}")
+    return bank.stats()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-generate the interview question bank.")
+    parser.add_argument("--companies", nargs="+", default=COMPANIES)
+    parser.add_argument("--roles", nargs="+", default=ROLES)
+    parser.add_argument("--target", type=int, default=QUESTIONS_PER_PAIR,
+                        help="Questions per company/role pair; existing pairs are only topped up")
+    args = parser.parse_args()
+    for row in build_bank(args.companies, args.roles, args.target):
+        print(f"{row['company']:<12} {row['role']:<28} {row['questions']}")
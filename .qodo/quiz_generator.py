@@ -1,69 +1,57 @@
 import os
 import re
-import streamlit as st
-import faiss
-import numpy as np
-from sentence_transformers import SentenceTransformer
-from transformers import pipeline
-from googlesearch import search
-import requests
-from bs4 import BeautifulSoup
-import pickle
-import json
+import model_registry
+import question_bank
+import performance_store
+import user_session
+from web_cache import cached_search, fetch_paragraphs
+from vector_index import search as vector_search
+from context_packer import build_packed_prompt
+import threading
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 
 os.environ["HF_TOKEN"] = "USE_YOUR_TOKEN"  # Replace with your actual token # removed for security
 
+# Number of prompts per padded generation batch in generate_quiz
+GENERATION_BATCH_SIZE = int(os.environ.get("QUIZ_BATCH_SIZE", "8"))
+# Serve built-in company/role pairs from the pre-generated question bank
+USE_QUESTION_BANK = os.environ.get("QUIZ_USE_BANK", "1").lower() in ("1", "true", "yes")
 
-# Cache model loading to improve performance
-@st.cache_resource
+
+# Models and the FAISS index are shared with study_assistant through model_registry and
+# loaded lazily on first use, so importing this module stays cheap
 def load_models():
     """Load text generation and embedding models."""
     try:
-        generator = pipeline("text-generation", model="t5-small", device=-1)
-        embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
-        print("Models loaded successfully: t5-small, all-MiniLM-L6-v2")
+        generator = model_registry.get_generator("t5-small", owner=__name__)
+        embedding_model = model_registry.get_embedding_model(owner=__name__)
         return generator, embedding_model
     except Exception as e:
         print(f"Error loading models: {e}")
         return None, None
 
-generator, embedding_model = load_models()
-
-# Cache FAISS index loading
-@st.cache_resource
-def load_faiss_index(index_path="data/faiss_index", docs_path="data/documents.pkl"):
-    """Load FAISS index and documents from disk."""
+def load_faiss_index(index_path="data/faiss_index", docs_path="data/documents"):
+    """Load FAISS index and the memory-mapped document store from disk."""
     try:
-        index = faiss.read_index(index_path)
-        with open(docs_path, "rb") as f:
-            documents = pickle.load(f)
-        print(f"Loaded FAISS index with {len(documents)} documents")
-        return index, documents
+        return model_registry.get_faiss_index(index_path, docs_path, owner=__name__)
     except Exception as e:
         print(f"Error loading FAISS index: {e}")
         return None, []
 
-faiss_index, documents = load_faiss_index()
-
 def web_search_questions(company, role, num_results=30):
     """Fetch interview questions from the web as a fallback."""
     query = f"{company} {role} interview questions 2025 site:*.edu | site:*.gov | site:glassdoor.com | site:interviewbit.com | site:tryexponent.com | site:geeksforgeeks.org"
     questions = set()
     try:
-        headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"}
-        search_results = search(query, num_results=num_results)
-        for result in search_results:
-            try:
-                response = requests.get(result, headers=headers, timeout=5)
-                soup = BeautifulSoup(response.text, "html.parser")
-                paragraphs = soup.find_all("p")
-                for p in paragraphs:
-                    text = p.get_text().strip().lower()
-                    if len(text) > 10 and any(keyword in text for keyword in ["write", "design", "tell me", "how would you", "explain"]):
-                        questions.add(text[:200])  # Limit to 200 chars
-            except Exception as e:
-                print(f"Error fetching {result}: {e}")
+        for url, paragraphs, error in fetch_paragraphs(cached_search(query, num_results=num_results)):
+            if error is not None:
+                print(f"Error fetching {url}: {error}")
+                continue
+            for p in paragraphs:
+                text = p.lower()
+                if len(text) > 10 and any(keyword in text for keyword in ["write", "design", "tell me", "how would you", "explain"]):
+                    questions.add(text[:200])  # Limit to 200 chars
         return questions
     except Exception as e:
         print(f"Web search error: {e}")
@@ -71,6 +59,8 @@ def web_search_questions(company, role, num_results=30):
 
 def fetch_interview_questions(company, role, num_questions=50):
     """Fetch unique interview questions using FAISS, with web search and generation as fallbacks."""
+    generator, embedding_model = load_models()
+    faiss_index, documents = load_faiss_index()
     if faiss_index is None or not documents:
         print("FAISS index not available, falling back to web search")
         return list(web_search_questions(company, role, num_results=num_questions))[:num_questions]
@@ -80,13 +70,12 @@ def fetch_interview_questions(company, role, num_questions=50):
         query = f"{company} {role} interview questions 2025"
         query_embedding = embedding_model.encode([query], show_progress_bar=False)
         
-        # Perform FAISS search
-        distances, indices = faiss_index.search(np.array(query_embedding, dtype=np.float32), k=num_questions)
-        similarities = [1 - (d / 2) for d in distances[0]]  # Convert L2 distance to cosine similarity
+        # Perform FAISS search (similarities are cosine for every index type)
+        similarities, indices = vector_search(faiss_index, query_embedding, num_questions)
         questions = set()
         
-        for idx, sim in zip(indices[0], similarities):
-            if idx < len(documents) and sim >= 0.5:
+        for idx, sim in zip(indices[0], similarities[0]):
+            if 0 <= idx < len(documents) and sim >= 0.5:
                 text = documents[idx].lower()
                 if len(text) > 10 and any(keyword in text for keyword in ["write", "design", "tell me", "how would you", "explain"]):
                     questions.add(text[:200])
@@ -124,8 +113,107 @@ def fetch_interview_questions(company, role, num_questions=50):
         print(f"Error in FAISS retrieval: {e}, falling back to web search")
         return list(web_search_questions(company, role, num_results=num_questions))[:num_questions]
 
-def generate_quiz(company="Meta", role="Software Engineer", num_questions=10):
-    """Generate a quiz with multiple-choice questions for interview preparation."""
+def _fallback_options(question, company):
+    """Canned options for questions the generator could not complete."""
+    if "write" in question.lower() or "code" in question.lower():
+        options = [
+            "1) Use a depth-first search approach",
+            "2) Use a breadth-first search approach",
+            "3) Use a linear scan",
+            "4) Use a binary search"
+        ]
+        correct_answer = "1) Use a depth-first search approach"
+        explanation = f"For {company}, coding questions like this typically require efficient algorithms like DFS."
+    elif "design" in question.lower():
+        options = [
+            "1) Use a monolithic architecture",
+            "2) Design a distributed system with sharding",
+            "3) Use a single database",
+            "4) Use a client-side cache"
+        ]
+        correct_answer = "2) Design a distributed system with sharding"
+        explanation = f"{company} system design questions focus on scalability."
+    else:  # Behavioral
+        options = [
+            "1) Use the STAR method to structure your response",
+            "2) Provide a brief overview without details",
+            "3) Focus only on the outcome",
+            "4) Avoid mentioning challenges"
+        ]
+        correct_answer = "1) Use the STAR method to structure your response"
+        explanation = f"{company} values clear, structured behavioral responses."
+    return options, correct_answer, explanation
+
+def parse_quiz_response(response, question, company):
+    """Parse a generated MCQ into a quiz entry, filling gaps with canned options."""
+    # Parse response with regex for robustness
+    question_text = ""
+    options = []
+    correct_answer = ""
+    explanation = ""
+    question_match = re.search(r"Question:.*?(?=\nOptions:|$)", response, re.DOTALL)
+    options_match = re.search(r"Options:.*?(?=\nCorrect Answer:|$)", response, re.DOTALL)
+    correct_match = re.search(r"Correct Answer:.*?(?=\nExplanation:|$)", response, re.DOTALL)
+    explanation_match = re.search(r"Explanation:.*", response, re.DOTALL)
+    
+    if question_match:
+        question_text = question_match.group(0).replace("Question:", "").strip()
+    if options_match:
+        options = [opt.strip() for opt in options_match.group(0).split("\n") if opt.strip().startswith(("1)", "2)", "3)", "4)"))]
+    if correct_match:
+        correct_answer = correct_match.group(0).replace("Correct Answer:", "").strip()
+    if explanation_match:
+        explanation = explanation_match.group(0).replace("Explanation:", "").strip()
+    
+    # Fallback for incomplete responses
+    if len(options) < 4 or not correct_answer or not explanation:
+        options, correct_answer, explanation = _fallback_options(question, company)
+    
+    return {
+        "question": question_text or question,
+        "options": options[:4],  # Ensure exactly 4 options
+        "correct_answer": correct_answer,
+        "explanation": explanation
+    }
+
+def retrieve_question_contexts(questions):
+    """Retrieve one FAISS context per question with a single encode and a single batched search."""
+    contexts = [""] * len(questions)
+    _, embedding_model = load_models()
+    faiss_index, documents = load_faiss_index()
+    if not (faiss_index and documents and questions):
+        return contexts
+    try:
+        question_embeddings = embedding_model.encode(questions, show_progress_bar=False)
+        similarities, indices = vector_search(faiss_index, question_embeddings, 1)
+        for i, (idx, sim) in enumerate(zip(indices[:, 0], similarities[:, 0])):
+            if 0 <= idx < len(documents) and sim >= 0.5:
+                contexts[i] = documents.get(idx, max_chars=500)
+    except Exception as e:
+        print(f"Error retrieving context for questions: {e}")
+    return contexts
+
+def generate_batched(prompts, batch_size=GENERATION_BATCH_SIZE, **generate_kwargs):
+    """Run the generator over prompts in padded batches; failed batches yield exceptions in place."""
+    generator, _ = load_models()
+    if generator is None:
+        return [RuntimeError("Generator not loaded")] * len(prompts)
+    if generator.tokenizer.pad_token is None:
+        generator.tokenizer.pad_token = generator.tokenizer.eos_token
+    results = []
+    for start in range(0, len(prompts), batch_size):
+        batch = prompts[start:start + batch_size]
+        try:
+            outputs = generator(batch, batch_size=len(batch), **generate_kwargs)
+            # text2text pipelines return one dict per prompt, text-generation pipelines a list per prompt
+            results.extend((output[0] if isinstance(output, list) else output)["generated_text"] for output in outputs)
+        except Exception as e:
+            print(f"Error generating batch starting at {start}: {e}")
+            results.extend([e] * len(batch))
+    return results
+
+def quiz_questions(company="Meta", role="Software Engineer", num_questions=10):
+    """Interview questions to build the quiz from, with generic fallbacks if none are found."""
     questions = fetch_interview_questions(company, role, num_questions)
     if not questions or any("error" in q.lower() for q in questions):
         # Fallback questions
@@ -137,105 +225,171 @@ def generate_quiz(company="Meta", role="Software Engineer", num_questions=10):
             "Write code to detect a cycle in a directed graph."
         ] * 2  # Repeat to ensure enough questions
         questions = list(set(questions))[:num_questions]  # Deduplicate and limit
+    return questions
+
+def _generate_mcqs(company, role, questions, batch_size):
+    """Turn interview questions into parsed multiple-choice quiz entries."""
+    contexts = retrieve_question_contexts(questions)
+    
+    # Fallback to web search for context if needed, running the lookups concurrently
+    missing = [i for i, context in enumerate(contexts) if not context]
+    if missing:
+        with ThreadPoolExecutor(max_workers=min(8, len(missing))) as pool:
+            web_contexts = pool.map(
+                lambda i: " ".join(web_search_questions(company, f"{role} {questions[i]}", num_results=1)), missing
+            )
+            for i, context in zip(missing, web_contexts):
+                contexts[i] = context
+    
+    generator, _ = load_models()
+    prompts = []
+    for question, context in zip(questions, contexts):
+        def build_prompt(context, question=question):
+            return (
+                f"Generate a multiple-choice question for a {company} {role} interview based on: {question}. "
+                f"Context: {context or 'None'}. Provide 4 options, one correct answer, and an explanation. "
+                f"Format as: Question: ... Options: 1) ... 2) ... 3) ... 4) ... Correct Answer: ... Explanation: ..."
+            )
+        if generator is not None:
+            # Fit the context into t5-small's input window instead of letting truncation cut the prompt
+            prompt, _ = build_packed_prompt(build_prompt, [(context, 1.0)], generator.tokenizer, "t5-small", 300)
+        else:
+            prompt = build_prompt(context)
+        prompts.append(prompt)
     
+    responses = generate_batched(prompts, batch_size, max_new_tokens=300, num_return_sequences=1, truncation=True)
     quiz_data = []
-    for idx, question in enumerate(questions, 1):
-        # Embed question to retrieve context for options
-        context = ""
-        if faiss_index and documents:
-            try:
-                question_embedding = embedding_model.encode([question], show_progress_bar=False)
-                distances, indices = faiss_index.search(np.array(question_embedding, dtype=np.float32), k=1)
-                if indices[0][0] < len(documents) and (1 - distances[0][0] / 2) >= 0.5:
-                    context = documents[indices[0][0]][:500]
-            except Exception as e:
-                print(f"Error retrieving context for question: {e}")
-        
-        # Fallback to web search for context if needed
-        if not context:
-            context = web_search_questions(f"{company} {role} {question}", num_results=1)
-        
-        prompt = (
-            f"Generate a multiple-choice question for a {company} {role} interview based on: {question}. "
-            f"Context: {context or 'None'}. Provide 4 options, one correct answer, and an explanation. "
-            f"Format as: Question: ... Options: 1) ... 2) ... 3) ... 4) ... Correct Answer: ... Explanation: ..."
-        )
-        try:
-            response = generator(
-                prompt,
-                max_new_tokens=300,
-                num_return_sequences=1,
-                truncation=True
-            )[0]["generated_text"]
-            
-            # Parse response with regex for robustness
-            question_text = ""
-            options = []
-            correct_answer = ""
-            explanation = ""
-            question_match = re.search(r"Question:.*?(?=\nOptions:|$)", response, re.DOTALL)
-            options_match = re.search(r"Options:.*?(?=\nCorrect Answer:|$)", response, re.DOTALL)
-            correct_match = re.search(r"Correct Answer:.*?(?=\nExplanation:|$)", response, re.DOTALL)
-            explanation_match = re.search(r"Explanation:.*", response, re.DOTALL)
-            
-            if question_match:
-                question_text = question_match.group(0).replace("Question:", "").strip()
-            if options_match:
-                options = [opt.strip() for opt in options_match.group(0).split("\n") if opt.strip().startswith(("1)", "2)", "3)", "4)"))]
-            if correct_match:
-                correct_answer = correct_match.group(0).replace("Correct Answer:", "").strip()
-            if explanation_match:
-                explanation = explanation_match.group(0).replace("Explanation:", "").strip()
-            
-            # Fallback for incomplete responses
-            if len(options) < 4 or not correct_answer or not explanation:
-                if "write" in question.lower() or "code" in question.lower():
-                    options = [
-                        "1) Use a depth-first search approach",
-                        "2) Use a breadth-first search approach",
-                        "3) Use a linear scan",
-                        "4) Use a binary search"
-                    ]
-                    correct_answer = "1) Use a depth-first search approach"
-                    explanation = f"For {company}, coding questions like this typically require efficient algorithms like DFS."
-                elif "design" in question.lower():
-                    options = [
-                        "1) Use a monolithic architecture",
-                        "2) Design a distributed system with sharding",
-                        "3) Use a single database",
-                        "4) Use a client-side cache"
-                    ]
-                    correct_answer = "2) Design a distributed system with sharding"
-                    explanation = f"{company} system design questions focus on scalability."
-                else:  # Behavioral
-                    options = [
-                        "1) Use the STAR method to structure your response",
-                        "2) Provide a brief overview without details",
-                        "3) Focus only on the outcome",
-                        "4) Avoid mentioning challenges"
-                    ]
-                    correct_answer = "1) Use the STAR method to structure your response"
-                    explanation = f"{company} values clear, structured behavioral responses."
-            
-            quiz_data.append({
-                "question": question_text or question,
-                "options": options[:4],  # Ensure exactly 4 options
-                "correct_answer": correct_answer,
-                "explanation": explanation
-            })
-        except Exception as e:
-            print(f"Error generating quiz question for {question}: {e}")
+    for question, response in zip(questions, responses):
+        if isinstance(response, Exception):
+            print(f"Error generating quiz question for {question}: {response}")
             quiz_data.append({
                 "question": question,
                 "options": ["1) N/A", "2) N/A", "3) N/A", "4) N/A"],
                 "correct_answer": "N/A",
-                "explanation": f"Error generating question: {e}"
+                "explanation": f"Error generating question: {response}"
             })
-    
+        else:
+            quiz_data.append(parse_quiz_response(response, question, company))
+    for question, entry in zip(questions, quiz_data):
+        entry["source"] = question  # The fetched question it was generated from; the bank dedupes on it
+    return quiz_data
+
+def generate_quiz_iter(company="Meta", role="Software Engineer", num_questions=10, batch_size=GENERATION_BATCH_SIZE,
+                       chunk_size=10, questions=None):
+    """Yield the quiz in chunks of `chunk_size` questions as each chunk is generated.
+
+    Retrieval and generation run per chunk, so the first page of questions is ready
+    without waiting for the whole quiz.
+    """
+    if questions is None:
+        questions = quiz_questions(company, role, num_questions)
+    for start in range(0, len(questions), chunk_size):
+        yield _generate_mcqs(company, role, questions[start:start + chunk_size], batch_size)
+
+def draw_from_bank(company, role, num_questions):
+    """Pre-generated quiz entries for a built-in company/role pair ([] for custom companies)."""
+    if not USE_QUESTION_BANK or company not in question_bank.COMPANIES:
+        return []
+    try:
+        return question_bank.get_bank().draw(company, role, num_questions)
+    except Exception as e:
+        print(f"Error drawing from question bank: {e}")
+        return []
+
+def bank_generated(company, role, quiz_data):
+    """Add live-generated entries for built-in pairs to the bank (already served once)."""
+    if not USE_QUESTION_BANK or company not in question_bank.COMPANIES:
+        return
+    try:
+        question_bank.get_bank().add(company, role, quiz_data, served=True)
+    except Exception as e:
+        print(f"Error adding to question bank: {e}")
+
+def remaining_questions(company, role, num_questions, drawn):
+    """Questions to generate live once `drawn` bank entries are used."""
+    needed = num_questions - len(drawn)
+    if needed <= 0:
+        return []
+    seen = {entry.get("source", entry["question"]) for entry in drawn}
+    return [q for q in quiz_questions(company, role, num_questions + len(seen)) if q not in seen][:needed]
+
+def generate_quiz(company="Meta", role="Software Engineer", num_questions=10, batch_size=GENERATION_BATCH_SIZE):
+    """Generate a quiz with multiple-choice questions for interview preparation.
+
+    Built-in company/role pairs are served from the question bank; only the shortfall
+    (or a custom company) is generated live. Live questions are embedded in one call,
+    contexts come from one batched FAISS search, and the generator runs over padded
+    batches of `batch_size` prompts.
+    """
+    quiz_data = draw_from_bank(company, role, num_questions)
+    questions = remaining_questions(company, role, num_questions, quiz_data)
+    if questions:
+        generated = _generate_mcqs(company, role, questions, batch_size)
+        bank_generated(company, role, generated)
+        quiz_data += generated
     return quiz_data
 
-def save_performance(company, role, score, total_questions):
-    """Save performance data to JSON file."""
+class QuizGenerationJob:
+    """Generates a quiz on a background thread, exposing questions as soon as they are ready.
+
+    The Streamlit script polls `snapshot()` and `progress()`; the worker never touches
+    session state itself.
+    """
+
+    def __init__(self, company, role, num_questions=50, chunk_size=10, batch_size=GENERATION_BATCH_SIZE):
+        self.company = company
+        self.role = role
+        self.num_questions = num_questions
+        self.chunk_size = chunk_size
+        self.batch_size = batch_size
+        self.total = num_questions  # Replaced by the real count once questions are fetched
+        self.done = False
+        self.error = None
+        self._quiz = []
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="quiz-generation", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        try:
+            drawn = draw_from_bank(self.company, self.role, self.num_questions)
+            with self._lock:
+                self._quiz.extend(drawn)
+            questions = remaining_questions(self.company, self.role, self.num_questions, drawn)
+            self.total = len(drawn) + len(questions)
+            for chunk in generate_quiz_iter(self.company, self.role, batch_size=self.batch_size,
+                                            chunk_size=self.chunk_size, questions=questions):
+                if self._cancelled.is_set():
+                    break
+                bank_generated(self.company, self.role, chunk)
+                with self._lock:
+                    self._quiz.extend(chunk)
+        except Exception as e:
+            print(f"Error generating quiz in background: {e}")
+            self.error = e
+        finally:
+            self.done = True
+
+    def cancel(self):
+        """Stop after the chunk currently being generated."""
+        self._cancelled.set()
+
+    def snapshot(self):
+        """Questions generated so far."""
+        with self._lock:
+            return list(self._quiz)
+
+    def progress(self):
+        """(questions ready, total questions expected)."""
+        with self._lock:
+            return len(self._quiz), self.total
+
+def save_performance(company, role, score, total_questions, user_id=user_session.DEFAULT_USER):
+    """Save performance data to the SQLite performance store."""
     performance_data = {
         "company": company,
         "role": role,
@@ -244,31 +398,27 @@ def save_performance(company, role, score, total_questions):
         "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     }
     try:
-        os.makedirs("data", exist_ok=True)
-        try:
-            with open("data/performance_history.json", "r") as f:
-                history = json.load(f)
-        except FileNotFoundError:
-            history = []
-        history.append(performance_data)
-        with open("data/performance_history.json", "w") as f:
-            json.dump(history, f, indent=4)
+        performance_store.get_store(user_id).add(performance_data)
         print(f"Saved performance: {score}/{total_questions} for {company} {role}")
     except Exception as e:
         print(f"Error saving performance: {e}")
 
-def load_performance():
-    """Load performance history from JSON file."""
+def load_performance(company=None, role=None, limit=None, user_id=user_session.DEFAULT_USER):
+    """Load performance history, optionally filtered by company/role (filtered in SQL)."""
     try:
-        with open("data/performance_history.json", "r") as f:
-            history = json.load(f)
-        return history
-    except FileNotFoundError:
-        return []
+        return performance_store.get_store(user_id).history(company, role, limit)
     except Exception as e:
         print(f"Error loading performance: {e}")
         return []
 
+def performance_summary(company, role, user_id=user_session.DEFAULT_USER):
+    """Attempts, average and best percentage for a company/role pair, or None."""
+    try:
+        return performance_store.get_store(user_id).summary(company, role)
+    except Exception as e:
+        print(f"Error loading performance summary: {e}")
+        return None
+
 if __name__ == "__main__":
     # Example usage for testing
     quiz = generate_quiz("Meta", "Software Engineer", num_questions=5)
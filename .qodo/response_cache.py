@@ -0,0 +1,181 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+import numpy as np
+from sqlite_local import ThreadLocalConnection
+
+# Semantic cache for generated answers, keyed by model name plus query embedding
+CACHE_PATH = os.environ.get("RESPONSE_CACHE_PATH", "data/response_cache.db")
+SIMILARITY_THRESHOLD = float(os.environ.get("RESPONSE_CACHE_THRESHOLD", "0.92"))
+MAX_ENTRIES = int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", "500"))
+TTL = int(os.environ.get("RESPONSE_CACHE_TTL", str(7 * 24 * 3600)))  # seconds
+
+class SemanticCache:
+    """LRU/TTL cache that returns a stored answer for any query whose embedding is close enough.
+
+    Entries are grouped by namespace (e.g. "response:t5-small"), so answers are only shared
+    between queries for the same task and model. Matching runs on the in-memory entries;
+    SQLite persists each insert and delete as it happens, written outside the lock that
+    lookups take.
+    """
+
+    def __init__(self, path=CACHE_PATH, threshold=SIMILARITY_THRESHOLD, max_entries=MAX_ENTRIES, ttl=TTL):
+        self.path = path
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()  # Orders disk writes without blocking lookups
+        self._entries = OrderedDict()  # id -> entry, least recently used first
+        self._stale = []  # ids expired in memory, deleted from disk with the next write
+        self._next_id = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._connect = ThreadLocalConnection(path)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "id INTEGER PRIMARY KEY, namespace TEXT NOT NULL, query TEXT NOT NULL, "
+                "embedding BLOB NOT NULL, answer TEXT NOT NULL, created REAL NOT NULL)"
+            )
+        self._load()
+
+    def _load(self):
+        try:
+            rows = self._connect().execute(
+                "SELECT id, namespace, query, embedding, answer, created FROM entries ORDER BY id"
+            ).fetchall()
+        except Exception as e:
+            print(f"Error loading response cache: {e}")
+            return
+        for entry_id, namespace, query, embedding, answer, created in rows:
+            self._entries[entry_id] = {
+                "namespace": namespace,
+                "query": query,
+                "embedding": np.frombuffer(embedding, dtype=np.float32),
+                "answer": answer,
+                "created": created
+            }
+            self._next_id = entry_id + 1
+        self._stale.extend(self._expire())
+        while len(self._entries) > self.max_entries:
+            self._stale.append(self._entries.popitem(last=False)[0])
+
+    def _write(self, deleted, inserted=None):
+        """Apply deletes and an optional (id, entry) insert; call with _write_lock held."""
+        try:
+            with self._connect() as conn:
+                if deleted:
+                    conn.executemany("DELETE FROM entries WHERE id = ?", [(i,) for i in deleted])
+                if inserted is not None:
+                    entry_id, entry = inserted
+                    conn.execute(
+                        "INSERT OR REPLACE INTO entries (id, namespace, query, embedding, answer, created) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (entry_id, entry["namespace"], entry["query"], entry["embedding"].tobytes(),
+                         entry["answer"], entry["created"])
+                    )
+        except Exception as e:
+            print(f"Error saving response cache: {e}")
+
+    @staticmethod
+    def _unit(embedding):
+        vector = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _expire(self):
+        """Drop entries older than the TTL from memory and return their ids."""
+        now = time.time()
+        expired = [i for i, e in self._entries.items() if now - e["created"] > self.ttl]
+        for i in expired:
+            del self._entries[i]
+        return expired
+
+    def _best_match(self, namespace, vector):
+        """Return (entry_id, similarity) of the closest live entry in namespace."""
+        self._stale.extend(self._expire())
+        ids = [i for i, e in self._entries.items() if e["namespace"] == namespace]
+        if not ids:
+            return None, -1.0
+        matrix = np.stack([self._entries[i]["embedding"] for i in ids])
+        similarities = matrix @ vector
+        best = int(np.argmax(similarities))
+        return ids[best], float(similarities[best])
+
+    def lookup(self, namespace, embedding):
+        """Return the cached answer for a semantically matching query, or None."""
+        vector = self._unit(embedding)
+        with self._lock:
+            entry_id, similarity = self._best_match(namespace, vector)
+            if entry_id is not None and similarity >= self.threshold:
+                self._entries.move_to_end(entry_id)
+                self.hits += 1
+                return self._entries[entry_id]["answer"]
+            self.misses += 1
+            return None
+
+    def store(self, namespace, query, embedding, answer):
+        """Store an answer, replacing a matching entry (e.g. after a regenerated answer)."""
+        vector = self._unit(embedding)
+        with self._lock:
+            entry_id, similarity = self._best_match(namespace, vector)
+            deleted, self._stale = self._stale, []
+            if entry_id is not None and similarity >= self.threshold:
+                del self._entries[entry_id]
+                deleted.append(entry_id)
+            new_id = self._next_id
+            entry = self._entries[new_id] = {
+                "namespace": namespace,
+                "query": query,
+                "embedding": vector,
+                "answer": answer,
+                "created": time.time()
+            }
+            self._next_id += 1
+            while len(self._entries) > self.max_entries:
+                deleted.append(self._entries.popitem(last=False)[0])
+            # Taken before releasing _lock so disk writes happen in the same order as memory updates
+            self._write_lock.acquire()
+        try:
+            self._write(deleted, (new_id, entry))
+        finally:
+            self._write_lock.release()
+
+    def clear(self):
+        """Drop every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._stale = []
+            self.hits = 0
+            self.misses = 0
+            with self._write_lock:
+                try:
+                    with self._connect() as conn:
+                        conn.execute("DELETE FROM entries")
+                except Exception as e:
+                    print(f"Error clearing response cache: {e}")
+
+    def stats(self):
+        """Hit/miss counters and current size."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+                "entries": len(self._entries)
+            }
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_cache():
+    """Return the process-wide response cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = SemanticCache()
+        return _cache
@@ -0,0 +1,25 @@
+import sqlite3
+import threading
+
+class ThreadLocalConnection:
+    """One SQLite connection per thread (Streamlit runs each session on its own thread).
+
+    Calling the object returns the current thread's connection, opened on first use in
+    WAL mode so readers on other threads are not blocked by a writer.
+    """
+
+    def __init__(self, path, timeout=10, row_factory=None):
+        self.path = path
+        self.timeout = timeout
+        self.row_factory = row_factory
+        self._local = threading.local()
+
+    def __call__(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout)
+            conn.execute("PRAGMA journal_mode=WAL")
+            if self.row_factory is not None:
+                conn.row_factory = self.row_factory
+            self._local.conn = conn
+        return conn
@@ -0,0 +1,85 @@
+import os
+import time
+import types
+import importlib
+import threading
+from contextlib import contextmanager
+
+# Load models in a background thread once the UI has drawn its first frame
+PREWARM = os.environ.get("STUDY_ASSISTANT_PREWARM", "1").lower() in ("1", "true", "yes")
+
+_timings = {}
+_timings_lock = threading.Lock()
+_prewarm_started = False
+
+def record(section, kind, seconds):
+    """Record a startup timing (kind is "import" or "load"); only the first, cold measurement is kept."""
+    with _timings_lock:
+        _timings.setdefault(section, {"section": section, "kind": kind, "seconds": round(seconds, 3)})
+
+@contextmanager
+def timed(section, kind="load"):
+    """Time the enclosed block and add it to the startup report."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(section, kind, time.perf_counter() - start)
+
+class _LazyModule(types.ModuleType):
+    """Module proxy that performs the real import on first attribute access."""
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.__dict__["_lazy_module"] = None
+
+    def _load(self):
+        module = self.__dict__["_lazy_module"]
+        if module is None:
+            with timed(f"import {self.__name__}", "import"):
+                module = importlib.import_module(self.__name__)
+            self.__dict__["_lazy_module"] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+def lazy_import(name):
+    """Return a proxy for module `name` that is only imported when first used."""
+    return _LazyModule(name)
+
+def report():
+    """Startup timings: per-module imports, lazy dependency imports and model loads."""
+    import model_registry
+    with _timings_lock:
+        rows = list(_timings.values())
+    rows += [
+        {"section": entry["resource"], "kind": "load", "seconds": entry["load_s"]}
+        for entry in model_registry.registry.report()
+    ]
+    return rows
+
+def print_report():
+    """Print the startup timing report to the console."""
+    for row in report():
+        print(f"[STARTUP] {row['kind']:<6} {row['section']:<40} {row['seconds']:.3f}s")
+
+def prewarm(loaders):
+    """Run `loaders` once per process in a daemon thread, so first requests find models ready."""
+    global _prewarm_started
+    with _timings_lock:
+        if _prewarm_started or not PREWARM:
+            return None
+        _prewarm_started = True
+
+    def run():
+        for loader in loaders:
+            try:
+                loader()
+            except Exception as e:
+                print(f"Error prewarming {getattr(loader, '__name__', loader)}: {e}")
+        print_report()
+
+    thread = threading.Thread(target=run, name="prewarm", daemon=True)
+    thread.start()
+    return thread
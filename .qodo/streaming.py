@@ -0,0 +1,58 @@
+import threading
+
+class GenerationStream:
+    """Iterable of generated text chunks.
+
+    Once fully consumed, `result` holds the post-processed text produced by `finalize`
+    from the concatenated raw chunks, so callers can render tokens as they arrive and
+    still store the same cleaned-up answer as the blocking functions return.
+    """
+
+    def __init__(self, chunks, finalize=None):
+        self._chunks = chunks
+        self._finalize = finalize
+        self.raw = ""
+        self.result = None
+
+    def __iter__(self):
+        parts = []
+        for chunk in self._chunks:
+            parts.append(chunk)
+            yield chunk
+        self.raw = "".join(parts)
+        self.result = self._finalize(self.raw) if self._finalize else self.raw
+
+    @classmethod
+    def of(cls, text):
+        """A stream that yields a ready-made text (cache hits, error messages) in one chunk."""
+        return cls(iter([text]))
+
+def stream_generate(generator, prompt, generate_kwargs):
+    """Yield newly generated text as the pipeline's model decodes it.
+
+    Runs `model.generate` on a background thread with a TextIteratorStreamer, so the first
+    chunk is available after a single decode step instead of after all max_new_tokens.
+    """
+    from transformers import TextIteratorStreamer
+    tokenizer = generator.tokenizer
+    encoded = tokenizer(prompt, return_tensors="pt", truncation=True)
+    # Only pass what generate() accepts (some tokenizers also return token_type_ids)
+    inputs = {key: encoded[key] for key in ("input_ids", "attention_mask") if key in encoded}
+    streamer = TextIteratorStreamer(tokenizer, skip_prompt=True, skip_special_tokens=True)
+    errors = []
+
+    def run():
+        try:
+            generator.model.generate(**inputs, streamer=streamer, **generate_kwargs)
+        except Exception as e:
+            errors.append(e)
+            streamer.end()
+
+    thread = threading.Thread(target=run, name="generate-stream", daemon=True)
+    thread.start()
+    for text in streamer:
+        if text:
+            yield text
+    thread.join()
+    if errors:
+        print(f"Error during streaming generation: {errors[0]}")
@@ -1,14 +1,12 @@
 import os
 import re
-import streamlit as st
-import faiss
-import numpy as np
-from sentence_transformers import SentenceTransformer
-from transformers import pipeline, AutoTokenizer, AutoModelForCausalLM, AutoModelForSeq2SeqLM
-from googlesearch import search
-import requests
-from bs4 import BeautifulSoup
-import pickle
+import model_registry
+import batching
+import response_cache
+from streaming import GenerationStream, stream_generate
+from context_packer import build_packed_prompt
+from web_cache import cached_search, fetch_paragraphs
+from vector_index import search as vector_search
 import warnings
 
 # Suppress warnings for cleaner output
@@ -17,247 +15,346 @@ warnings.filterwarnings("ignore")
 # Placeholder for Hugging Face token (not used as models are public)
 os.environ["HF_TOKEN"] = "USE_YOUR_TOKEN"  # Replace with your actual token # removed for security
 
+# Web pages are cut to this many chars; more than fills the largest model context window
+WEB_RESULT_CHARS = 4000
 
-# Cache embedding model loading for FAISS
-@st.cache_resource
+
+# Models and the FAISS index are shared with quiz_generator through model_registry and
+# loaded lazily on first use, so importing this module stays cheap
 def load_embedding_model():
     """Load embedding model for FAISS."""
     try:
-        embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
-        print("Embedding model loaded: all-MiniLM-L6-v2")
-        return embedding_model
+        return model_registry.get_embedding_model(owner=__name__)
     except Exception as e:
         print(f"Error loading embedding model: {e}")
         return None
 
-embedding_model = load_embedding_model()
-
-# Cache FAISS index loading
-@st.cache_resource
-def load_faiss_index(index_path="data/faiss_index", docs_path="data/documents.pkl"):
-    """Load FAISS index and documents from disk."""
+def load_faiss_index(index_path="data/faiss_index", docs_path="data/documents"):
+    """Load FAISS index and the memory-mapped document store from disk."""
     try:
-        index = faiss.read_index(index_path)
-        with open(docs_path, "rb") as f:
-            documents = pickle.load(f)
-        print(f"Loaded FAISS index with {len(documents)} documents")
-        return index, documents
+        return model_registry.get_faiss_index(index_path, docs_path, owner=__name__)
     except Exception as e:
         print(f"Error loading FAISS index: {e}")
         return None, []
 
-faiss_index, documents = load_faiss_index()
-
-# Cache model loading based on model_name
-@st.cache_resource
 def load_model(model_name):
     """Load a single text generation model based on model_name."""
     try:
-        if model_name == "t5-small":
-            tokenizer = AutoTokenizer.from_pretrained("t5-small")
-            model = AutoModelForSeq2SeqLM.from_pretrained("t5-small")
-            generator = pipeline("text2text-generation", model=model, tokenizer=tokenizer, device=-1)
-        elif model_name == "facebook/bart-large":
-            tokenizer = AutoTokenizer.from_pretrained("facebook/bart-large")
-            model = AutoModelForSeq2SeqLM.from_pretrained("facebook/bart-large")
-            generator = pipeline("text-generation", model=model, tokenizer=tokenizer, device=-1)
-        else:  # Default to gpt2
-            tokenizer = AutoTokenizer.from_pretrained("gpt2")
-            model = AutoModelForCausalLM.from_pretrained("gpt2")
-            generator = pipeline("text-generation", model=model, tokenizer=tokenizer, device=-1)
-        print(f"Model loaded successfully: {model_name}")
+        generator = model_registry.get_generator(model_name, owner=__name__)
         return generator, None  # Return tuple for compatibility with app.py
     except Exception as e:
         print(f"Error loading model {model_name}: {e}")
         return None, None
 
+def web_search_results(query, num_results=3):
+    """Return the paragraph text of each web search result page, up to WEB_RESULT_CHARS each."""
+    results = []
+    for url, paragraphs, error in fetch_paragraphs(cached_search(query, num_results=num_results)):
+        if error is not None:
+            print(f"Error fetching {url}: {error}")
+            continue
+        text = " ".join(paragraphs)[:WEB_RESULT_CHARS]
+        if text:
+            results.append(text)
+    return results
+
 def web_search(query, num_results=3):
     """Perform a web search as a fallback if FAISS retrieval is insufficient."""
     try:
-        headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
-        results = []
-        for url in search(query, num_results=num_results):
-            try:
-                response = requests.get(url, headers=headers, timeout=5)
-                soup = BeautifulSoup(response.text, "html.parser")
-                paragraphs = soup.find_all("p")
-                text = " ".join([p.get_text().strip() for p in paragraphs if p.get_text().strip()])
-                if text:
-                    results.append(text[:500])  # Limit to 500 chars per result
-            except Exception as e:
-                print(f"Error fetching {url}: {e}")
+        results = [text[:500] for text in web_search_results(query, num_results)]  # Limit to 500 chars per result
         return " ".join(results) if results else "No relevant web results found."
     except Exception as e:
         return f"Web search error: {e}"
 
-def retrieve_context(query, k=3, similarity_threshold=0.5):
-    """Retrieve context using FAISS, with web search as fallback."""
+def retrieve_chunks(query, k=3, similarity_threshold=0.5):
+    """Retrieve scored context chunks [(text, score)] using FAISS, with web search as fallback.
+
+    Chunks are returned at full length (web pages up to WEB_RESULT_CHARS); callers pack them
+    into a token budget.
+    """
+    embedding_model = load_embedding_model()
+    faiss_index, documents = load_faiss_index()
+    chunks = []
     if faiss_index is None or not documents or embedding_model is None:
         print("FAISS index or embedding model not available, falling back to web search")
-        return web_search(query, num_results=k)
+    else:
+        try:
+            query_embedding = embedding_model.encode([query], show_progress_bar=False)
+            
+            # Perform FAISS search (similarities are cosine for every index type)
+            similarities, indices = vector_search(faiss_index, query_embedding, k)
+            for idx, sim in zip(indices[0], similarities[0]):
+                if 0 <= idx < len(documents) and sim >= similarity_threshold:
+                    chunks.append((documents[idx], float(sim)))
+        except Exception as e:
+            print(f"Error in FAISS retrieval: {e}, falling back to web search")
     
-    # Embed query
+    # Fallback to web search if insufficient results
+    if len(chunks) < k:
+        print(f"FAISS retrieved {len(chunks)} results, falling back to web search for {k - len(chunks)} more")
+        try:
+            web_results = web_search_results(query, num_results=k - len(chunks))
+        except Exception as e:
+            print(f"Web search error: {e}")
+            web_results = []
+        # Web results rank below every FAISS match, in search-result order
+        chunks.extend((text, -1.0 - rank) for rank, text in enumerate(web_results))
+    return chunks
+
+def retrieve_context(query, k=3, similarity_threshold=0.5):
+    """Retrieve context using FAISS, with web search as fallback."""
+    chunks = retrieve_chunks(query, k, similarity_threshold)
+    # Limit to 500 chars per source
+    return " ".join(text[:500] for text, _ in chunks) if chunks else "No relevant context found."
+
+def _cache_lookup(kind, model_name, text, use_cache=True):
+    """Embed `text` and look it up in the semantic response cache; returns (answer, embedding)."""
+    embedding_model = load_embedding_model()
+    if embedding_model is None:
+        return None, None
     try:
-        query_embedding = embedding_model.encode([query], show_progress_bar=False)
-        
-        # Perform FAISS search
-        distances, indices = faiss_index.search(np.array(query_embedding, dtype=np.float32), k)
-        similarities = [1 - (d / 2) for d in distances[0]]  # Convert L2 distance to cosine similarity
-        context = []
-        
-        for idx, sim in zip(indices[0], similarities):
-            if idx < len(documents) and sim >= similarity_threshold:
-                context.append(documents[idx][:500])  # Limit to 500 chars per document
-        
-        # Fallback to web search if insufficient results
-        if len(context) < k:
-            print(f"FAISS retrieved {len(context)} results, falling back to web search for {k - len(context)} more")
-            web_context = web_search(query, num_results=k - len(context))
-            context.append(web_context)
-        
-        return " ".join(context) if context else "No relevant context found."
+        embedding = embedding_model.encode([text], show_progress_bar=False)[0]
     except Exception as e:
-        print(f"Error in FAISS retrieval: {e}, falling back to web search")
-        return web_search(query, num_results=k)
+        print(f"Error embedding query for response cache: {e}")
+        return None, None
+    if not use_cache:
+        return None, embedding
+    return response_cache.get_cache().lookup(f"{kind}:{model_name}", embedding), embedding
 
-def generate_response(query, model_name="gpt2", max_tokens=150):
-    """Generate a response using the selected model and retrieved context."""
-    generator, _ = load_model(model_name)
-    if generator is None:
-        return "Error loading model. Please try another model or check dependencies."
-    
-    context = retrieve_context(query)
+def _cache_store(kind, model_name, text, embedding, answer):
+    """Store a generated answer in the semantic response cache."""
+    if embedding is not None:
+        response_cache.get_cache().store(f"{kind}:{model_name}", text, embedding, answer)
+
+def _generation_kwargs(generator, model_name, max_tokens, temperature):
+    """Decoding settings for model_name (t5 decodes greedily, the others sample)."""
     if model_name == "t5-small":
-        prompt = (
+        return {"max_new_tokens": max_tokens}
+    return {
+        "max_new_tokens": max_tokens,
+        "pad_token_id": generator.tokenizer.eos_token_id,
+        "do_sample": True,
+        "top_p": 0.9,
+        "temperature": temperature
+    }
+
+def _run_generator(generator, model_name, prompt, generate_kwargs):
+    """Run the pipeline and return only the newly generated text."""
+    # Concurrent requests with the same settings are merged into one padded batch
+    response = batching.generate(
+        generator,
+        prompt,
+        num_return_sequences=1,
+        truncation=True,
+        **generate_kwargs
+    )[0]["generated_text"]
+    return response if model_name == "t5-small" else response[len(prompt):]
+
+def _response_prompt(query, model_name, context):
+    if model_name == "t5-small":
+        return (
             f"question: {query} context: You are a study assistant. Provide a clear, concise, and accurate answer. "
             f"Use mathematical notation if needed. Web context: {context or 'None'} answer: "
         )
-        response = generator(
-            prompt,
-            max_new_tokens=max_tokens,
-            num_return_sequences=1,
-            truncation=True
-        )[0]["generated_text"]
-        answer = response.strip()
-    else:  # gpt2 or facebook/bart-large
-        prompt = (
-            f"You are a study assistant specializing in accurate, concise academic answers. "
-            f"Answer only the question asked in clear language, using mathematical notation if needed. "
-            f"Do not repeat the question, generate new questions, or include unrelated content. "
-            f"If the question is unclear, say so. Web context: {context or 'None'}\nQuestion: {query}\nAnswer: "
-        )
-        response = generator(
-            prompt,
-            max_new_tokens=max_tokens,
-            num_return_sequences=1,
-            truncation=True,
-            pad_token_id=generator.tokenizer.eos_token_id,
-            do_sample=True,
-            top_p=0.9,
-            temperature=0.6
-        )[0]["generated_text"]
-        answer = response[len(prompt):].strip()
+    # gpt2 or facebook/bart-large
+    return (
+        f"You are a study assistant specializing in accurate, concise academic answers. "
+        f"Answer only the question asked in clear language, using mathematical notation if needed. "
+        f"Do not repeat the question, generate new questions, or include unrelated content. "
+        f"If the question is unclear, say so. Web context: {context or 'None'}\nQuestion: {query}\nAnswer: "
+    )
+
+def _finalize_response(query, model_name, generated):
+    """Post-process generated answer text; returns (answer, is_valid)."""
+    print(f"[DEBUG] Raw response: {generated}")
+    answer = generated.strip()
+    if model_name != "t5-small":
         answer = re.sub(r"[_]+|Question:.*|Answer:.*|provide.*study assistant.*", "", answer, flags=re.IGNORECASE).strip()
-    
-    print(f"[DEBUG] Raw response: {response}")
     if not answer or len(answer) < 10 or "study assistant" in answer.lower():
-        return "I couldn't generate a clear answer. Please try rephrasing your question."
+        return "I couldn't generate a clear answer. Please try rephrasing your question.", False
     if "theorem" in query.lower() or "math" in query.lower():
         if not any(term in answer.lower() for term in ["equation", "a^2", "b^2", "c^2", "square", "triangle"]):
-            return "I couldn't provide an accurate mathematical answer. Please try rephrasing or ask another question."
-    return answer
+            return "I couldn't provide an accurate mathematical answer. Please try rephrasing or ask another question.", False
+    return answer, True
 
-def generate_study_plan(goal, model_name="gpt2", max_tokens=300):
-    """Generate a study plan based on the user's learning goal."""
-    generator, _ = load_model(model_name)
-    if generator is None:
-        return "Error loading model. Please try another model or check dependencies."
-    
-    context = retrieve_context(f"{goal} study plan")
+def _study_plan_prompt(goal, model_name, context):
     if model_name == "t5-small":
-        prompt = (
+        return (
             f"task: Create a study plan for the goal: {goal}. Provide a concise, structured plan with steps and a timeline. "
             f"Web context: {context or 'None'} answer: "
         )
-        response = generator(
-            prompt,
-            max_new_tokens=max_tokens,
-            num_return_sequences=1,
-            truncation=True
-        )[0]["generated_text"]
-        plan = response.strip()
-    else:
-        prompt = (
-            f"You are a study assistant tasked with creating a structured study plan for the goal: {goal}. "
-            f"Provide a concise plan with clear steps, a timeline, and specific tasks. "
-            f"Do not include unrelated content or questions. Format as a numbered list. Web context: {context or 'None'}\nGoal: {goal}\nStudy Plan: "
-        )
-        response = generator(
-            prompt,
-            max_new_tokens=max_tokens,
-            num_return_sequences=1,
-            truncation=True,
-            pad_token_id=generator.tokenizer.eos_token_id,
-            do_sample=True,
-            top_p=0.9,
-            temperature=0.7
-        )[0]["generated_text"]
-        plan = response[len(prompt):].strip()
+    return (
+        f"You are a study assistant tasked with creating a structured study plan for the goal: {goal}. "
+        f"Provide a concise plan with clear steps, a timeline, and specific tasks. "
+        f"Do not include unrelated content or questions. Format as a numbered list. Web context: {context or 'None'}\nGoal: {goal}\nStudy Plan: "
+    )
+
+def _finalize_study_plan(model_name, generated):
+    """Post-process generated study plan text; returns (plan, is_valid)."""
+    print(f"[DEBUG] Raw study plan response: {generated}")
+    plan = generated.strip()
+    if model_name != "t5-small":
         plan = re.sub(r"[_]+|Goal:.*|Study Plan:.*", "", plan, flags=re.IGNORECASE).strip()
-    
-    print(f"[DEBUG] Raw study plan response: {response}")
     if not plan or len(plan) < 10:
-        return "I couldn't generate a clear study plan. Please try rephrasing your goal."
-    return plan
+        return "I couldn't generate a clear study plan. Please try rephrasing your goal.", False
+    return plan, True
 
-def generate_quiz(topic, model_name="gpt2", is_interview_prep=False, company=None, max_tokens=300):
-    """Generate a quiz with questions, options, and answers for a topic or interview prep."""
-    generator, _ = load_model(model_name)
-    if generator is None:
-        return "Error loading model. Please try another model or check dependencies."
-    
-    context = retrieve_context(f"{topic} quiz questions" if not is_interview_prep else f"{company} {topic} interview questions 2025")
+def _quiz_prompt(topic, model_name, is_interview_prep, company, context):
     if model_name == "t5-small":
-        prompt = (
+        return (
             f"task: Create a quiz for {'interview preparation for a software developer role at ' + (company or 'a tech company') if is_interview_prep else f'the topic: {topic}'}. "
             f"Generate a quiz with 3 questions, each with 4 multiple-choice options and the correct answer. "
             f"{'Include tips for answering.' if is_interview_prep else 'Focus on academic content.'} "
             f"Format as: Question: ... Options: 1) ... 2) ... 3) ... 4) ... Correct Answer: ... {'Tip: ...' if is_interview_prep else ''} "
             f"Web context: {context or 'None'} answer: "
         )
-        response = generator(
-            prompt,
-            max_new_tokens=max_tokens,
-            num_return_sequences=1,
-            truncation=True
-        )[0]["generated_text"]
-        quiz = response.strip()
-    else:
-        prompt = (
-            f"You are a study assistant creating a quiz for {'interview preparation for a software developer role at ' + (company or 'a tech company') if is_interview_prep else f'the topic: {topic}'}. "
-            f"Generate a quiz with 3 questions, each with 4 multiple-choice options and the correct answer. "
-            f"{'Include a mix of coding, behavioral, and HR-related questions. Include tips for answering.' if is_interview_prep else 'Focus on academic or study-related content.'} "
-            f"Format as: Question: ... Options: 1) ... 2) ... 3) ... 4) ... Correct Answer: ... {'Tip: ...' if is_interview_prep else ''} "
-            f"Web context: {context or 'None'}\nQuiz: "
-        )
-        response = generator(
-            prompt,
-            max_new_tokens=max_tokens,
-            num_return_sequences=1,
-            truncation=True,
-            pad_token_id=generator.tokenizer.eos_token_id,
-            do_sample=True,
-            top_p=0.9,
-            temperature=0.7
-        )[0]["generated_text"]
-        quiz = response[len(prompt):].strip()
+    return (
+        f"You are a study assistant creating a quiz for {'interview preparation for a software developer role at ' + (company or 'a tech company') if is_interview_prep else f'the topic: {topic}'}. "
+        f"Generate a quiz with 3 questions, each with 4 multiple-choice options and the correct answer. "
+        f"{'Include a mix of coding, behavioral, and HR-related questions. Include tips for answering.' if is_interview_prep else 'Focus on academic or study-related content.'} "
+        f"Format as: Question: ... Options: 1) ... 2) ... 3) ... 4) ... Correct Answer: ... {'Tip: ...' if is_interview_prep else ''} "
+        f"Web context: {context or 'None'}\nQuiz: "
+    )
+
+def _finalize_quiz(model_name, generated):
+    """Post-process generated quiz text."""
+    print(f"[DEBUG] Raw quiz response: {generated}")
+    quiz = generated.strip()
+    if model_name != "t5-small":
         quiz = re.sub(r"[_]+|Quiz:.*", "", quiz, flags=re.IGNORECASE).strip()
-    
-    print(f"[DEBUG] Raw quiz response: {response}")
     if not quiz or len(quiz) < 10:
         return "I couldn't generate a clear quiz. Please try rephrasing your topic or company."
     return quiz
 
+def _quiz_context_query(topic, is_interview_prep, company):
+    return f"{topic} quiz questions" if not is_interview_prep else f"{company} {topic} interview questions 2025"
+
+def generate_response(query, model_name="gpt2", max_tokens=150, use_cache=True):
+    """Generate a response using the selected model and retrieved context.
+
+    Answers are served from the semantic response cache when a near-identical question
+    was answered before; pass use_cache=False to force a regenerated answer.
+    """
+    cached, embedding = _cache_lookup("response", model_name, query, use_cache)
+    if cached is not None:
+        print(f"[DEBUG] Response cache hit for: {query}")
+        return cached
+    
+    generator, _ = load_model(model_name)
+    if generator is None:
+        return "Error loading model. Please try another model or check dependencies."
+    
+    prompt, _ = build_packed_prompt(
+        lambda context: _response_prompt(query, model_name, context),
+        retrieve_chunks(query), generator.tokenizer, model_name, max_tokens
+    )
+    generated = _run_generator(generator, model_name, prompt, _generation_kwargs(generator, model_name, max_tokens, 0.6))
+    answer, valid = _finalize_response(query, model_name, generated)
+    if valid:
+        _cache_store("response", model_name, query, embedding, answer)
+    return answer
+
+def generate_study_plan(goal, model_name="gpt2", max_tokens=300, use_cache=True):
+    """Generate a study plan based on the user's learning goal (cached like generate_response)."""
+    cached, embedding = _cache_lookup("study_plan", model_name, goal, use_cache)
+    if cached is not None:
+        print(f"[DEBUG] Response cache hit for goal: {goal}")
+        return cached
+    
+    generator, _ = load_model(model_name)
+    if generator is None:
+        return "Error loading model. Please try another model or check dependencies."
+    
+    prompt, _ = build_packed_prompt(
+        lambda context: _study_plan_prompt(goal, model_name, context),
+        retrieve_chunks(f"{goal} study plan"), generator.tokenizer, model_name, max_tokens
+    )
+    generated = _run_generator(generator, model_name, prompt, _generation_kwargs(generator, model_name, max_tokens, 0.7))
+    plan, valid = _finalize_study_plan(model_name, generated)
+    if valid:
+        _cache_store("study_plan", model_name, goal, embedding, plan)
+    return plan
+
+def generate_quiz(topic, model_name="gpt2", is_interview_prep=False, company=None, max_tokens=300):
+    """Generate a quiz with questions, options, and answers for a topic or interview prep."""
+    generator, _ = load_model(model_name)
+    if generator is None:
+        return "Error loading model. Please try another model or check dependencies."
+    
+    prompt, _ = build_packed_prompt(
+        lambda context: _quiz_prompt(topic, model_name, is_interview_prep, company, context),
+        retrieve_chunks(_quiz_context_query(topic, is_interview_prep, company)), generator.tokenizer, model_name, max_tokens
+    )
+    generated = _run_generator(generator, model_name, prompt, _generation_kwargs(generator, model_name, max_tokens, 0.7))
+    return _finalize_quiz(model_name, generated)
+
+def generate_response_stream(query, model_name="gpt2", max_tokens=150, use_cache=True):
+    """Streaming variant of generate_response: a GenerationStream of answer text chunks.
+
+    The raw tokens are yielded as they are decoded; once the stream is consumed its
+    `result` holds the post-processed answer (the same text generate_response returns).
+    """
+    cached, embedding = _cache_lookup("response", model_name, query, use_cache)
+    if cached is not None:
+        print(f"[DEBUG] Response cache hit for: {query}")
+        return GenerationStream.of(cached)
+    
+    generator, _ = load_model(model_name)
+    if generator is None:
+        return GenerationStream.of("Error loading model. Please try another model or check dependencies.")
+    
+    prompt, _ = build_packed_prompt(
+        lambda context: _response_prompt(query, model_name, context),
+        retrieve_chunks(query), generator.tokenizer, model_name, max_tokens
+    )
+    
+    def finalize(generated):
+        answer, valid = _finalize_response(query, model_name, generated)
+        if valid:
+            _cache_store("response", model_name, query, embedding, answer)
+        return answer
+    
+    chunks = stream_generate(generator, prompt, _generation_kwargs(generator, model_name, max_tokens, 0.6))
+    return GenerationStream(chunks, finalize)
+
+def generate_study_plan_stream(goal, model_name="gpt2", max_tokens=300, use_cache=True):
+    """Streaming variant of generate_study_plan (see generate_response_stream)."""
+    cached, embedding = _cache_lookup("study_plan", model_name, goal, use_cache)
+    if cached is not None:
+        print(f"[DEBUG] Response cache hit for goal: {goal}")
+        return GenerationStream.of(cached)
+    
+    generator, _ = load_model(model_name)
+    if generator is None:
+        return GenerationStream.of("Error loading model. Please try another model or check dependencies.")
+    
+    prompt, _ = build_packed_prompt(
+        lambda context: _study_plan_prompt(goal, model_name, context),
+        retrieve_chunks(f"{goal} study plan"), generator.tokenizer, model_name, max_tokens
+    )
+    
+    def finalize(generated):
+        plan, valid = _finalize_study_plan(model_name, generated)
+        if valid:
+            _cache_store("study_plan", model_name, goal, embedding, plan)
+        return plan
+    
+    chunks = stream_generate(generator, prompt, _generation_kwargs(generator, model_name, max_tokens, 0.7))
+    return GenerationStream(chunks, finalize)
+
+def generate_quiz_stream(topic, model_name="gpt2", is_interview_prep=False, company=None, max_tokens=300):
+    """Streaming variant of generate_quiz (see generate_response_stream)."""
+    generator, _ = load_model(model_name)
+    if generator is None:
+        return GenerationStream.of("Error loading model. Please try another model or check dependencies.")
+    
+    prompt, _ = build_packed_prompt(
+        lambda context: _quiz_prompt(topic, model_name, is_interview_prep, company, context),
+        retrieve_chunks(_quiz_context_query(topic, is_interview_prep, company)), generator.tokenizer, model_name, max_tokens
+    )
+    chunks = stream_generate(generator, prompt, _generation_kwargs(generator, model_name, max_tokens, 0.7))
+    return GenerationStream(chunks, lambda generated: _finalize_quiz(model_name, generated))
+
 def main():
     """Console-based interface (not used in web app)."""
     print("This script is designed to be called by app.py. Run 'streamlit run app.py' instead.")
@@ -0,0 +1,45 @@
+"""Regression checks for the append-only chat history log.
+
+Run from the .qodo directory:
+    python -m pytest -q tests
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import chat_history
+
+def messages(start, stop):
+    return [["You" if i % 2 == 0 else "Assistant", f"message {i}"] for i in range(start, stop)]
+
+def test_save_after_tail_load_keeps_older_entries(tmp_path):
+    path = str(tmp_path / "chat_history.jsonl")
+    chat_history.save_chat_history(messages(0, 100), path)
+    chat_history._logs.pop(path)  # A fresh session in the same process
+
+    history = chat_history.load_chat_history(path, last_n=5)
+    assert history == messages(95, 100)
+    history.append(["You", "message 100"])
+    chat_history.save_chat_history(history, path)
+
+    chat_history._logs.pop(path)
+    assert chat_history.load_chat_history(path) == messages(0, 101)
+
+def test_rewritten_tail_keeps_entries_before_it(tmp_path):
+    path = str(tmp_path / "chat_history.jsonl")
+    chat_history.save_chat_history(messages(0, 50), path)
+    history = chat_history.load_chat_history(path, last_n=10)
+    history[-1] = ["Assistant", "edited"]
+    chat_history.save_chat_history(history, path)
+    history.append(["You", "after edit"])
+    chat_history.save_chat_history(history, path)
+
+    chat_history._logs.pop(path)
+    assert chat_history.load_chat_history(path) == messages(0, 49) + [["Assistant", "edited"], ["You", "after edit"]]
+
+def test_tail_of_short_log_is_complete(tmp_path):
+    path = str(tmp_path / "chat_history.jsonl")
+    chat_history.save_chat_history(messages(0, 3), path)
+    assert chat_history.load_chat_history(path, last_n=3) == messages(0, 3)
+    assert chat_history._state(path).partial is False
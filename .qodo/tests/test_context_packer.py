@@ -0,0 +1,39 @@
+"""Checks for context_packer.pack_context.
+
+Run from the .qodo directory:
+    python -m pytest -q tests
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from context_packer import pack_context
+
+class WordTokenizer:
+    """One token per whitespace-separated word; records how much text it was asked to tokenize."""
+
+    def __init__(self):
+        self.chars_tokenized = 0
+
+    def __call__(self, text, add_special_tokens=False):
+        self.chars_tokenized += len(text)
+        return {"input_ids": list(range(len(text.split())))}
+
+    def decode(self, ids, skip_special_tokens=True):
+        return " ".join("w" for _ in ids)
+
+def test_pack_context_stops_tokenizing_once_budget_is_spent():
+    tokenizer = WordTokenizer()
+    page = "word " * 100_000
+    context, stats = pack_context([("best chunk", 1.0), (page, 0.5), (page, 0.1)], tokenizer, budget=10)
+    assert stats["tokens_used"] == 10
+    assert stats["chunks_used"] == 2 and stats["chunks_dropped"] == 1
+    assert stats["tokens_dropped"] > 100_000  # Estimated from characters
+    assert tokenizer.chars_tokenized < 1000
+    assert context.startswith("best chunk")
+
+def test_pack_context_keeps_chunks_that_fit():
+    context, stats = pack_context([("a b", 0.2), ("c d e", 0.9)], WordTokenizer(), budget=10)
+    assert context == "c d e a b"
+    assert stats["tokens_used"] == 5 and stats["tokens_dropped"] == 0
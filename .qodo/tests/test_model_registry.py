@@ -0,0 +1,35 @@
+"""Eviction checks for ResourceRegistry.
+
+Run from the .qodo directory:
+    python -m pytest -q tests
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import model_registry
+from model_registry import ResourceRegistry
+
+class Sized:
+    def __init__(self, size_bytes):
+        self.path = None
+        self.size_bytes = size_bytes
+
+def test_first_load_makes_room_using_size_hint(monkeypatch):
+    monkeypatch.setattr(model_registry, "estimate_size", lambda obj: obj.size_bytes)
+    registry = ResourceRegistry(max_bytes=100)
+    registry.acquire("a", lambda: Sized(60), evictable=True, size_hint=60)
+    peak = []
+    def load_b():
+        peak.append(registry.total_bytes())  # Resident while b is being loaded
+        return Sized(60)
+    registry.acquire("b", load_b, evictable=True, size_hint=60)
+    assert peak == [0]
+    assert registry.memory_stats()["evicted"] == {"a": 1}
+
+def test_expected_generator_bytes_scales_with_backend():
+    torch_bytes = model_registry.expected_generator_bytes("t5-small", "torch")
+    assert torch_bytes == model_registry.GENERATOR_SIZE_MB["t5-small"] * 2**20
+    assert model_registry.expected_generator_bytes("t5-small", "int8") < torch_bytes
+    assert model_registry.expected_generator_bytes("unknown", "torch") == model_registry.expected_generator_bytes("gpt2", "torch")
@@ -0,0 +1,50 @@
+"""Regression checks for quiz_generator against real transformers pipeline output shapes.
+
+The models are tiny and randomly initialised (no downloads); only the shape of what the
+pipelines return matters here, not the text.
+
+Run from the .qodo directory:
+    python -m pytest -q tests
+"""
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+torch = pytest.importorskip("torch")
+transformers = pytest.importorskip("transformers")
+tokenizers = pytest.importorskip("tokenizers")
+
+import quiz_generator
+
+WORDS = ["<pad>", "</s>", "<unk>"] + [f"w{i}" for i in range(50)] + "what is a binary tree question".split()
+
+def tiny_tokenizer():
+    tokenizer = tokenizers.Tokenizer(tokenizers.models.WordLevel({w: i for i, w in enumerate(WORDS)}, unk_token="<unk>"))
+    tokenizer.pre_tokenizer = tokenizers.pre_tokenizers.WhitespaceSplit()
+    return transformers.PreTrainedTokenizerFast(tokenizer_object=tokenizer, unk_token="<unk>", pad_token="<pad>",
+                                                eos_token="</s>", model_max_length=512)
+
+def tiny_t5_pipeline():
+    torch.manual_seed(0)
+    config = transformers.T5Config(vocab_size=len(WORDS), d_model=16, d_ff=32, num_layers=1, num_heads=2, d_kv=8,
+                                   decoder_start_token_id=0, pad_token_id=0, eos_token_id=1)
+    model = transformers.T5ForConditionalGeneration(config).eval()
+    return transformers.pipeline("text2text-generation", model=model, tokenizer=tiny_tokenizer(), device=-1)
+
+def tiny_gpt2_pipeline():
+    torch.manual_seed(0)
+    config = transformers.GPT2Config(vocab_size=len(WORDS), n_positions=128, n_embd=16, n_layer=1, n_head=2,
+                                     bos_token_id=1, eos_token_id=1)
+    model = transformers.GPT2LMHeadModel(config).eval()
+    return transformers.pipeline("text-generation", model=model, tokenizer=tiny_tokenizer(), device=-1)
+
+@pytest.mark.parametrize("make_pipeline", [tiny_t5_pipeline, tiny_gpt2_pipeline])
+def test_generate_batched_handles_pipeline_output_shapes(monkeypatch, make_pipeline):
+    generator = make_pipeline()
+    monkeypatch.setattr(quiz_generator, "load_models", lambda: (generator, None))
+    prompts = ["what is a binary tree", "question w1 w2", "w3 w4 w5"]
+    results = quiz_generator.generate_batched(prompts, batch_size=2, max_new_tokens=4, do_sample=False)
+    assert len(results) == len(prompts)
+    assert all(isinstance(result, str) for result in results), results
@@ -0,0 +1,73 @@
+import os
+import re
+import uuid
+import hashlib
+import threading
+from collections import OrderedDict
+
+# Per-user data lives in data/users/<shard>/<user id>/, where the shard is a hash prefix of
+# the id, so every save and load touches one user's files only
+DATA_DIR = os.environ.get("USER_DATA_DIR", "data/users")
+DEFAULT_USER = "default"  # Scripts and single-user runs; keeps the pre-sharding file locations
+MAX_CACHED_USERS = int(os.environ.get("USER_CACHE_SIZE", "256"))
+
+def normalize_user_id(user_id):
+    """Restrict user ids to a filesystem-safe form; empty ids map to the default user."""
+    user_id = re.sub(r"[^A-Za-z0-9_-]", "", str(user_id or ""))[:64]
+    return user_id or DEFAULT_USER
+
+def shard(user_id):
+    """Two-hex-digit shard of a user id (256 directories)."""
+    return hashlib.sha1(user_id.encode("utf-8")).hexdigest()[:2]
+
+def user_path(user_id, filename, legacy_path=None):
+    """Path of `filename` for this user; the default user keeps `legacy_path` if given."""
+    user_id = normalize_user_id(user_id)
+    if user_id == DEFAULT_USER and legacy_path:
+        return legacy_path
+    directory = os.path.join(DATA_DIR, shard(user_id), user_id)
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, filename)
+
+def current_user_id():
+    """User id for the current Streamlit session.
+
+    Taken from the `?user=` query parameter; a new session without one gets a random id,
+    which is written back to the URL so reloads and bookmarks keep the same data.
+    """
+    import streamlit as st
+    if "user_id" not in st.session_state:
+        user_id = st.query_params.get("user")
+        st.session_state.user_id = normalize_user_id(user_id) if user_id else uuid.uuid4().hex
+    if st.query_params.get("user") != st.session_state.user_id:
+        st.query_params["user"] = st.session_state.user_id
+    return st.session_state.user_id
+
+class LRUCache:
+    """Thread-safe mapping bounded to `max_size` entries, evicting the least recently used."""
+
+    def __init__(self, max_size=MAX_CACHED_USERS):
+        self.max_size = max_size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_create(self, key, factory):
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                return self._items[key]
+            value = self._items[key] = factory()
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+            return value
+
+    def pop(self, key):
+        with self._lock:
+            return self._items.pop(key, None)
+
+    def items(self):
+        with self._lock:
+            return list(self._items.items())
+
+    def __len__(self):
+        return len(self._items)
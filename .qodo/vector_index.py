@@ -0,0 +1,103 @@
+import os
+import numpy as np
+from startup import lazy_import
+
+faiss = lazy_import("faiss")
+
+# Index type and query-time knobs, overridable from the environment
+INDEX_TYPES = ("flat", "ivf_flat", "hnsw", "ivf_pq")
+INDEX_TYPE = os.environ.get("FAISS_INDEX_TYPE", "flat")
+NPROBE = int(os.environ.get("FAISS_NPROBE", "16"))
+EF_SEARCH = int(os.environ.get("FAISS_EF_SEARCH", "64"))
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 200
+PQ_REFINE_FACTOR = 4
+# IVF/PQ need enough vectors to train their k-means (PQ: 39 points per each of its
+# 256 centroids); smaller corpora fall back to Flat
+MIN_TRAIN_VECTORS = {"ivf_flat": 1000, "ivf_pq": 9984}
+
+def _nlist(num_vectors):
+    """Number of IVF lists: ~4*sqrt(n), keeping at least 39 training points per list."""
+    return max(1, min(int(4 * np.sqrt(num_vectors)), num_vectors // 39))
+
+def _pq_subquantizers(dimension):
+    """Largest sub-quantizer count <= dimension/8 that divides the dimension."""
+    for m in range(max(1, dimension // 8), 0, -1):
+        if dimension % m == 0:
+            return m
+    return 1
+
+def normalize(embeddings):
+    """Return float32, L2-normalised embeddings so L2 distance maps onto cosine similarity."""
+    vectors = np.ascontiguousarray(np.array(embeddings, dtype=np.float32))
+    faiss.normalize_L2(vectors)
+    return vectors
+
+def create_index(dimension, index_type=INDEX_TYPE, num_vectors=0):
+    """Create an (untrained) FAISS index of the requested type."""
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type {index_type!r}, expected one of {INDEX_TYPES}")
+    if num_vectors < MIN_TRAIN_VECTORS.get(index_type, 0):
+        print(f"Only {num_vectors} vectors, too few to train {index_type}; using flat index")
+        index_type = "flat"
+    if index_type == "flat":
+        return faiss.IndexFlatL2(dimension)
+    if index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dimension, HNSW_M)
+        index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+        return index
+    quantizer = faiss.IndexFlatL2(dimension)
+    nlist = _nlist(num_vectors)
+    if index_type == "ivf_flat":
+        return faiss.IndexIVFFlat(quantizer, dimension, nlist, faiss.METRIC_L2)
+    # IVF-PQ distances are approximate; re-rank the shortlist with exact vectors so the
+    # returned distances (and therefore cosine similarities) are exact
+    ivfpq = faiss.IndexIVFPQ(quantizer, dimension, nlist, _pq_subquantizers(dimension), 8)
+    index = faiss.IndexRefineFlat(ivfpq)
+    index.k_factor = PQ_REFINE_FACTOR
+    return index
+
+def build_index(embeddings, index_type=INDEX_TYPE):
+    """Normalise embeddings, then create, train and fill an index."""
+    vectors = normalize(embeddings)
+    index = create_index(vectors.shape[1], index_type, len(vectors))
+    if not index.is_trained:
+        index.train(vectors)
+    index.add(vectors)
+    configure_search(index)
+    return index
+
+def configure_search(index, nprobe=NPROBE, ef_search=EF_SEARCH):
+    """Apply query-time accuracy/latency knobs (nprobe for IVF, efSearch for HNSW)."""
+    base = index
+    if isinstance(faiss.downcast_index(index), faiss.IndexRefine):
+        base = faiss.downcast_index(index).base_index
+    ivf = faiss.try_extract_index_ivf(base)
+    if ivf is not None:
+        ivf.nprobe = min(nprobe, ivf.nlist)
+    base = faiss.downcast_index(base)
+    if isinstance(base, faiss.IndexHNSW):
+        base.hnsw.efSearch = ef_search
+    return index
+
+def to_cosine(index, distances):
+    """Convert raw search distances to cosine similarities for the index's metric.
+
+    For unit vectors, squared L2 distance d = 2 - 2cos, so cos = 1 - d/2; inner-product
+    indexes already return cosine. Missing results (-1 ids) come back as -inf.
+    """
+    distances = np.asarray(distances, dtype=np.float32)
+    if index.metric_type == faiss.METRIC_INNER_PRODUCT:
+        similarities = distances.copy()
+    else:
+        similarities = 1 - distances / 2
+    similarities[~np.isfinite(distances) | (np.abs(distances) >= np.finfo(np.float32).max / 2)] = -np.inf
+    return similarities
+
+def search(index, query_embeddings, k):
+    """Search normalised queries and return (similarities, indices) arrays."""
+    k = min(k, index.ntotal) if index.ntotal else k
+    distances, indices = index.search(normalize(query_embeddings), k)
+    similarities = to_cosine(index, distances)
+    similarities[indices < 0] = -np.inf
+    return similarities, indices
@@ -0,0 +1,147 @@
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+from collections import deque
+from startup import lazy_import
+from sqlite_local import ThreadLocalConnection
+from web_fetcher import fetch_pages, extract_paragraphs
+
+# Shared on-disk cache for search results and extracted page text
+CACHE_PATH = os.environ.get("WEB_CACHE_PATH", "data/web_cache.db")
+CACHE_TTL = int(os.environ.get("WEB_CACHE_TTL", str(24 * 3600)))  # seconds
+CACHE_MAX_BYTES = int(os.environ.get("WEB_CACHE_MAX_BYTES", str(100 * 1024 * 1024)))
+EVICT_EVERY = 32  # Check the size bound every N writes rather than on each one
+# Offline replay: serve only from the cache and never touch the network
+OFFLINE = os.environ.get("STUDY_ASSISTANT_OFFLINE", "").lower() in ("1", "true", "yes")
+
+googlesearch = lazy_import("googlesearch")
+
+def normalize_query(query):
+    """Normalise a query so trivially different spellings share a cache entry."""
+    return re.sub(r"\s+", " ", query.strip().lower())
+
+def cache_key(kind, *parts, normalize=True):
+    """Stable key for a cache entry of the given kind."""
+    raw = "|".join([kind] + [normalize_query(str(p)) if normalize else str(p) for p in parts])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+class WebCache:
+    """SQLite-backed TTL cache with least-recently-used eviction by total size."""
+
+    def __init__(self, path=CACHE_PATH, ttl=CACHE_TTL, max_bytes=CACHE_MAX_BYTES, keep_expired=OFFLINE):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.keep_expired = keep_expired  # Offline replay still serves expired entries
+        self._writes = 0
+        self._connect = ThreadLocalConnection(path)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+                "created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries (accessed)")
+
+    def get(self, key, allow_stale=False):
+        """Return the cached value, or None if missing or older than the TTL."""
+        conn = self._connect()
+        row = conn.execute("SELECT value, created FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        value, created = row
+        if not allow_stale and time.time() - created > self.ttl:
+            return None
+        with conn:
+            conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (time.time(), key))
+        return json.loads(value)
+
+    def put(self, key, value):
+        """Store a JSON-serialisable value and evict old entries if over the size bound."""
+        data = json.dumps(value)
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, data, len(data), now, now)
+            )
+        self._writes += 1
+        if self._writes % EVICT_EVERY == 0:
+            self.evict()
+
+    def evict(self):
+        """Drop expired entries, then least recently used ones until under max_bytes."""
+        conn = self._connect()
+        with conn:
+            if not self.keep_expired:
+                conn.execute("DELETE FROM entries WHERE created < ?", (time.time() - self.ttl,))
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            for key, size in conn.execute("SELECT key, size FROM entries ORDER BY accessed").fetchall():
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                total -= size
+                if total <= self.max_bytes:
+                    break
+
+    def clear(self):
+        """Remove every entry."""
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM entries")
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_cache():
+    """Return the process-wide web cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = WebCache()
+        return _cache
+
+def cached_search(query, num_results=10):
+    """googlesearch.search with caching; in offline mode only cached results are returned."""
+    cache = get_cache()
+    key = cache_key("search", query, num_results)
+    urls = cache.get(key, allow_stale=OFFLINE)
+    if urls is not None:
+        return urls
+    if OFFLINE:
+        print(f"[DEBUG] Offline mode: no cached search results for {query!r}")
+        return []
+    urls = list(googlesearch.search(query, num_results=num_results))
+    cache.put(key, urls)
+    return urls
+
+def fetch_paragraphs(urls, **fetch_kwargs):
+    """Yield (url, paragraphs, error) for each URL, serving cached page text first.
+
+    Cache misses are fetched concurrently through web_fetcher.fetch_pages and stored;
+    in offline mode misses are skipped. `urls` may be a lazy iterable.
+    """
+    cache = get_cache()
+    hits = deque()
+
+    def misses():
+        for url in urls:
+            paragraphs = cache.get(cache_key("page", url, normalize=False), allow_stale=OFFLINE)
+            if paragraphs is not None:
+                hits.append((url, paragraphs, None))
+            elif not OFFLINE:
+                yield url
+
+    for url, paragraphs, error in fetch_pages(misses(), parse=extract_paragraphs, **fetch_kwargs):
+        while hits:
+            yield hits.popleft()
+        if error is None:
+            cache.put(cache_key("page", url, normalize=False), paragraphs)
+        yield url, paragraphs, error
+    while hits:
+        yield hits.popleft()
@@ -0,0 +1,121 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from urllib.parse import urlparse
+from startup import lazy_import
+
+requests = lazy_import("requests")
+bs4 = lazy_import("bs4")
+
+HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
+
+# Defaults for the fetch engine (tuned for polite scraping of search results)
+MAX_WORKERS = 16
+PER_HOST_LIMIT = 2
+REQUEST_TIMEOUT = 5
+POOL_SIZE = 32
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_session():
+    """Return the shared keep-alive requests session (connection pool is thread-safe)."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+            _session.mount("http://", adapter)
+            _session.mount("https://", adapter)
+            _session.headers.update(HEADERS)
+        return _session
+
+def extract_paragraphs(html):
+    """Extract the non-empty <p> texts from an HTML page."""
+    soup = bs4.BeautifulSoup(html, "html.parser")
+    return [p.get_text().strip() for p in soup.find_all("p") if p.get_text().strip()]
+
+def extract_text(html):
+    """Extract the joined paragraph text from an HTML page."""
+    return " ".join(extract_paragraphs(html))
+
+class _HostLimiter:
+    """Per-host semaphores so one site never gets more than `limit` concurrent requests."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.lock = threading.Lock()
+        self.semaphores = {}
+
+    def get(self, url):
+        host = urlparse(url).netloc.lower()
+        with self.lock:
+            if host not in self.semaphores:
+                self.semaphores[host] = threading.BoundedSemaphore(self.limit)
+            return self.semaphores[host]
+
+def _fetch_one(url, limiter, timeout, deadline, parse):
+    """Fetch a single URL under its host limit and run the parser on the body."""
+    semaphore = limiter.get(url)
+    with semaphore:
+        remaining = deadline - time.monotonic() if deadline else timeout
+        if remaining <= 0:
+            raise TimeoutError("global deadline reached before request started")
+        response = get_session().get(url, timeout=min(timeout, remaining))
+        response.raise_for_status()
+        return parse(response.text) if parse else response.text
+
+def fetch_pages(urls, parse=extract_text, max_workers=MAX_WORKERS, per_host_limit=PER_HOST_LIMIT,
+                timeout=REQUEST_TIMEOUT, deadline=None):
+    """Fetch URLs concurrently and yield (url, result, error) as each page completes.
+
+    `urls` may be any iterable (including a lazy generator of search results); URLs are
+    submitted as they are produced. `parse` runs on the worker thread so raw HTML is never
+    held longer than needed. `deadline` is a global budget in seconds for the whole batch;
+    anything still pending when it expires is cancelled and reported as a timeout.
+    """
+    limiter = _HostLimiter(per_host_limit)
+    end = time.monotonic() + deadline if deadline else None
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    pending = {}
+    seen = set()
+    url_iter = iter(urls)
+    exhausted = False
+    try:
+        while True:
+            # Keep the queue topped up to twice the worker count so input stays lazy
+            while not exhausted and len(pending) < max_workers * 2:
+                if end and time.monotonic() >= end:
+                    exhausted = True
+                    break
+                try:
+                    url = next(url_iter)
+                except StopIteration:
+                    exhausted = True
+                    break
+                except Exception as e:
+                    print(f"Error producing URLs: {e}")
+                    exhausted = True
+                    break
+                if url in seen:
+                    continue
+                seen.add(url)
+                pending[executor.submit(_fetch_one, url, limiter, timeout, end, parse)] = url
+            if not pending:
+                break
+            wait_timeout = max(0, end - time.monotonic()) if end else None
+            done, _ = wait(pending, timeout=wait_timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                for future, url in pending.items():
+                    future.cancel()
+                    yield url, None, TimeoutError("global deadline exceeded")
+                pending.clear()
+                break
+            for future in done:
+                url = pending.pop(future)
+                try:
+                    yield url, future.result(), None
+                except Exception as e:
+                    yield url, None, e
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)